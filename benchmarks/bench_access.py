@@ -0,0 +1,62 @@
+""" settings access benchmark
+
+Reads settings values through group attribute, group item, dict based
+snapshot and compiled snapshot.
+
+  python benchmarks/bench_access.py [reads]
+"""
+import sys, time, colander
+from zope.interface.registry import Components
+
+from memphis import config
+
+
+def setup():
+    nodes = [config.SchemaNode(colander.Str(), name='node%s'%n, default='')
+             for n in range(10)]
+    group = config.registerSettings('group', *nodes)
+    compiled = config.registerSettings(
+        'compiled', *[node.clone() for node in nodes], compiled=True)
+
+    config.initialize(('memphis.config', __name__), reg=Components('bench'))
+    return group, compiled
+
+
+def bench(func, repeat=5):
+    times = []
+    for i in range(repeat):
+        t = time.time()
+        func()
+        times.append(time.time() - t)
+    return min(times)
+
+
+def main(reads=1000000):
+    group, compiled = setup()
+    snapshot = group.snapshot
+    csnapshot = compiled.snapshot
+    loop = range(reads)
+
+    def attr():
+        for i in loop:
+            group.node5
+
+    def item():
+        for i in loop:
+            group['node5']
+
+    def dsnapshot():
+        for i in loop:
+            snapshot.node5
+
+    def slots():
+        for i in loop:
+            csnapshot.node5
+
+    print '%10s %10s %10s %10s'%('attr, s', 'item, s', 'dict, s', 'slots, s')
+    print '%10.4f %10.4f %10.4f %10.4f'%(
+        bench(attr), bench(item), bench(dsnapshot), bench(slots))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,88 @@
+""" settings flatten/unflatten benchmark
+
+Registers settings groups with Sequence of Mapping settings and
+measures flatten and unflatten with generic colander path and with
+schema path index.
+
+  python benchmarks/bench_flatten.py [groups] [items]
+"""
+import sys, time, colander
+from zope.interface.registry import Components
+
+from memphis import config
+from memphis.config.schema import Mapping, Sequence
+
+
+def group(name, mapping, sequence):
+    item = colander.SchemaNode(
+        mapping(),
+        config.SchemaNode(colander.Str(), name='name', default=''),
+        config.SchemaNode(colander.Int(), name='value', default=0),
+        colander.SchemaNode(
+            sequence(),
+            config.SchemaNode(colander.Str(), name='tag'),
+            name='tags', default=[]),
+        name='item')
+
+    return colander.SchemaNode(
+        mapping(),
+        config.SchemaNode(sequence(), item, name='items', default=[]),
+        config.SchemaNode(colander.Str(), name='title', default=''),
+        name=name)
+
+
+def setup(groups, items):
+    data = {}
+    generic = colander.SchemaNode(colander.Mapping(), name='settings')
+    for g in range(groups):
+        name = 'group%s'%g
+        config.registerSettings(
+            name, *group(name, Mapping, Sequence).children)
+        generic.add(group(name, colander.Mapping, colander.Sequence))
+
+        data['%s.title'%name] = 'title'
+        for i in range(items):
+            prefix = '%s.items.%s'%(name, i)
+            data['%s.name'%prefix] = 'name%s'%i
+            data['%s.value'%prefix] = str(i)
+            data['%s.tags.0'%prefix] = 'tag1'
+            data['%s.tags.1'%prefix] = 'tag2'
+
+    config.initialize(('memphis.config', __name__), reg=Components('bench'))
+    return generic, data
+
+
+def bench(func, repeat=10):
+    times = []
+    for i in range(repeat):
+        t = time.time()
+        func()
+        times.append(time.time() - t)
+    return min(times)
+
+
+def main(groups=20, items=50):
+    generic, data = setup(groups, items)
+    index = config.Settings.index()
+    appstruct = index.unflatten(data)
+
+    # colander schema of same structure, paths are sorted and
+    # regrouped on every level
+    gdata = dict(('settings.%s'%k, v) for k, v in data.items())
+    gappstruct = generic.unflatten(gdata)
+
+    assert gappstruct == appstruct
+    assert index.flatten(appstruct) == data
+
+    print '%8s %12s %12s %12s %12s'%(
+        'keys', 'unflatten, s', 'indexed, s', 'flatten, s', 'indexed, s')
+    print '%8d %12.4f %12.4f %12.4f %12.4f'%(
+        len(data),
+        bench(lambda: generic.unflatten(gdata)),
+        bench(lambda: index.unflatten(data)),
+        bench(lambda: generic.flatten(gappstruct)),
+        bench(lambda: index.flatten(appstruct)))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
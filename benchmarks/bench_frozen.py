@@ -0,0 +1,85 @@
+""" frozen registry lookup benchmark
+
+Measures ``queryMultiAdapter``, ``queryAdapter`` and ``queryUtility``
+of plain components registry and of frozen registry.
+
+  python benchmarks/bench_frozen.py [calls]
+"""
+import sys, time
+from zope import interface
+from zope.interface.registry import Components
+
+from memphis.config.frozen import FrozenRegistry
+
+
+class IContext(interface.Interface):
+    pass
+
+class IRequest(interface.Interface):
+    pass
+
+class IAdapter(interface.Interface):
+    pass
+
+class IUtility(interface.Interface):
+    pass
+
+
+class Context(object):
+    interface.implements(IContext)
+
+
+class Request(object):
+    interface.implements(IRequest)
+
+
+class Adapter(object):
+
+    def __init__(self, *context):
+        self.context = context
+
+
+def bench(funcs, calls, repeat=10):
+    # runs are interleaved, results are less affected by machine load
+    times = [[] for func in funcs]
+    for i in range(repeat):
+        for func, res in zip(funcs, times):
+            t = time.time()
+            for j in xrange(calls):
+                func()
+            res.append(time.time() - t)
+    return [min(res) for res in times]
+
+
+def main(calls=100000):
+    reg = Components('bench')
+    reg.registerAdapter(Adapter, (IContext, IRequest), IAdapter)
+    reg.registerAdapter(Adapter, (IContext,), IAdapter)
+    reg.registerUtility(object(), IUtility)
+    frozen = FrozenRegistry(reg)
+
+    objects = (Context(), Request())
+    ctx = objects[0]
+
+    rows = [
+        ('multi adapter', lambda r: lambda:
+             r.queryMultiAdapter(objects, IAdapter)),
+        ('multi adapter miss', lambda r: lambda:
+             r.queryMultiAdapter(objects, IAdapter, 'unknown')),
+        ('adapter', lambda r: lambda:
+             r.queryAdapter(ctx, IAdapter)),
+        ('utility', lambda r: lambda:
+             r.queryUtility(IUtility)),
+        ('utility miss', lambda r: lambda:
+             r.queryUtility(IUtility, 'unknown')),
+        ]
+
+    print '%d calls' % calls
+    print '%-20s %10s %10s' % ('', 'plain', 'frozen')
+    for title, factory in rows:
+        plain, fast = bench((factory(reg), factory(frozen)), calls)
+        print '%-20s %9.3fs %9.3fs' % (title, plain, fast)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,69 @@
+""" layout resolution benchmark
+
+Registers layout for root of content tree and queries it for objects
+on different depth, with adapter lookup on every level and with
+layout resolution cache.
+
+  python benchmarks/bench_layout.py [depth ...]
+"""
+import sys, time
+from zope.interface.registry import Components
+from pyramid import testing
+
+from memphis import config, view
+from memphis.view.layout import queryLayout
+
+
+class Context(object):
+
+    def __init__(self, parent=None):
+        self.__parent__ = parent
+
+
+class Root(Context):
+    pass
+
+
+def uncached(request, context, name=''):
+    # previous implementation
+    while context is not None:
+        layout = config.registry.queryMultiAdapter(
+            (context, request), view.ILayout, name)
+        if layout is not None:
+            return layout
+
+        context = getattr(context, '__parent__', None)
+
+
+def bench(func, repeat=5, number=1000):
+    times = []
+    for i in range(repeat):
+        t = time.time()
+        for j in xrange(number):
+            func()
+        times.append(time.time() - t)
+    return min(times)
+
+
+def main(*depths):
+    view.registerLayout('', context=Root)
+    config.initialize(('memphis.view', __name__), reg=Components('bench'))
+    request = testing.DummyRequest()
+
+    print '%8s %12s %12s'%('depth', 'lookup, s', 'cached, s')
+    for depth in depths or (1, 10, 50):
+        context = Root()
+        for i in range(depth - 1):
+            context = Context(context)
+
+        assert type(queryLayout(request, context)) is \
+            type(uncached(request, context))
+
+        print '%8d %12.4f %12.4f'%(
+            depth,
+            bench(lambda: uncached(request, context)),
+            bench(lambda: queryLayout(request, context)))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
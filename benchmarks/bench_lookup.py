@@ -0,0 +1,107 @@
+""" adapter lookup and event dispatch benchmark
+
+Measures interface adaptation through memphis adapter hook and
+``config.notify``. Before is adapter hook that calls
+``registry.queryAdapter`` and notify through ``registry.subscribers``.
+
+  python benchmarks/bench_lookup.py [calls]
+"""
+import sys, time
+from zope import interface
+from zope.interface.registry import Components
+from zope.interface.interface import adapter_hooks
+from zope.interface.interfaces import ObjectEvent, IObjectEvent
+
+from memphis import config
+from memphis.config import api
+
+
+class IContext(interface.Interface):
+    pass
+
+class IAdapter(interface.Interface):
+    pass
+
+
+class Context(object):
+    interface.implements(IContext)
+
+
+class Adapter(object):
+
+    def __init__(self, context):
+        self.context = context
+
+
+class Event(object):
+    pass
+
+
+def queryAdapterHook(iface, obj, name='', default=None):
+    # previous implementation
+    return api.registry.queryAdapter(obj, iface, name, default)
+
+
+def notifyBefore(registry, event):
+    # previous implementation
+    registry.subscribers((event,), None)
+
+
+def objectEventNotifyBefore(event):
+    event.registry.subscribers((event.object, event), None)
+
+
+def bench(func, calls, repeat=10):
+    times = []
+    for i in range(repeat):
+        t = time.time()
+        for j in xrange(calls):
+            func()
+        times.append(time.time() - t)
+    return min(times)
+
+
+def withHook(hook, func):
+    idx = adapter_hooks.index(api.adapterHook)
+    adapter_hooks[idx] = hook
+    try:
+        return func()
+    finally:
+        adapter_hooks[idx] = api.adapterHook
+
+
+def main(calls=200000):
+    config.initialize(('memphis.config',), reg=Components('bench'))
+    config.registry.registerAdapter(Adapter, (IContext,), IAdapter)
+    config.registry.registerHandler(api.objectEventNotify, (IObjectEvent,))
+    config.registry.registerHandler(
+        lambda ob, ev: None, (IContext, IObjectEvent))
+
+    before = Components('before')
+    before.registerHandler(objectEventNotifyBefore, (IObjectEvent,))
+    before.registerHandler(lambda ob, ev: None, (IContext, IObjectEvent))
+
+    ctx = Context()
+    obj = object()
+    event = Event()
+    objectEvent = ObjectEvent(ctx)
+    objectEvent.registry = before
+
+    print '%16s %12s %12s'%('', 'before, s', 'after, s')
+    for title, func in [('adapt', lambda: IAdapter(ctx)),
+                        ('not adaptable', lambda: IAdapter(obj, None))]:
+        print '%16s %12.4f %12.4f'%(
+            title,
+            withHook(queryAdapterHook, lambda: bench(func, calls)),
+            bench(func, calls))
+
+    for title, ev in [('no subscribers', event),
+                      ('object event', objectEvent)]:
+        print '%16s %12.4f %12.4f'%(
+            title,
+            bench(lambda: notifyBefore(before, ev), calls),
+            bench(lambda: config.notify(ev), calls))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,62 @@
+""" resolveConflicts benchmark
+
+Generates synthetic directive sets and measures conflict resolution time.
+
+  python benchmarks/bench_resolve.py [size ...]
+"""
+import sys, time
+from memphis.config import directives
+
+
+class Info(object):
+
+    def __init__(self, filename):
+        self.filename = filename
+
+
+def discriminator(action):
+    return ('bench:class', action.args[0])
+
+
+def makeActions(size, offset=0):
+    actions = []
+    for i in xrange(offset, offset + size):
+        if i % 2:
+            action = directives.Action(
+                None, (i,), discriminator=('bench:adapter', i, ''))
+        else:
+            action = directives.ClassAction(
+                None, (i,), discriminator=discriminator)
+        if not i % 100:
+            action.order = 1
+        action.info = Info('/bench/module%s.py'%(i % 50))
+        actions.append(action)
+    return actions
+
+
+def bench(func, *args):
+    t = time.time()
+    func(*args)
+    return time.time() - t
+
+
+def main(sizes=(1000, 10000, 100000)):
+    print '%10s %12s %12s %14s'%(
+        'actions', 'resolve, s', 'us/action', 'delta 1k, s')
+
+    for size in sizes:
+        actions = makeActions(size)
+        index = directives.DiscriminatorIndex()
+        t = bench(directives.resolveConflicts, actions, index)
+
+        delta = makeActions(1000, size)
+        td = bench(directives.resolveConflicts, delta, index)
+
+        print '%10d %12.4f %12.2f %14.4f'%(size, t, t/size*1000000, td)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main([int(s) for s in sys.argv[1:]])
+    else:
+        main()
@@ -0,0 +1,57 @@
+""" directives.scan prefetch benchmark
+
+Each scan runs in a fresh interpreter, so modules are imported from disk.
+Cold cache runs drop OS page cache, this requires root.
+
+  python benchmarks/bench_scan.py [package] [threads]
+"""
+import os, sys, time, subprocess
+
+SCAN = """
+import sys, time
+t = time.time()
+from memphis.config import directives
+directives.scan(sys.argv[1], set(), None, None, int(sys.argv[2]))
+print time.time() - t
+"""
+
+
+def dropCaches():
+    try:
+        subprocess.call(['sync'])
+        f = open('/proc/sys/vm/drop_caches', 'w')
+        f.write('3\n')
+        f.close()
+        return True
+    except (IOError, OSError):
+        return False
+
+
+def run(package, threads, cold):
+    if cold and not dropCaches():
+        return None
+
+    output = subprocess.Popen(
+        [sys.executable, '-c', SCAN, package, str(threads)],
+        stdout=subprocess.PIPE).communicate()[0]
+    return float(output.strip().splitlines()[-1])
+
+
+def main(package='memphis', threads=4, repeat=5):
+    print '%10s %10s %12s'%('cache', 'prefetch', 'scan, s')
+
+    for cold in (True, False):
+        for prefetch in (0, threads):
+            times = [run(package, prefetch, cold) for i in range(repeat)]
+            if None in times:
+                print '%10s %10s %12s'%(
+                    'cold', prefetch, 'n/a (requires root)')
+                continue
+            print '%10s %10s %12.4f'%(
+                cold and 'cold' or 'warm', prefetch, min(times))
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    main(args[0] if args else 'memphis',
+         int(args[1]) if len(args) > 1 else 4)
@@ -0,0 +1,59 @@
+""" settings schema deserialization benchmark
+
+Registers settings groups with 5000 keys total and deserializes
+settings data with generic colander path and compiled schema.
+
+  python benchmarks/bench_schema.py [groups] [nodes]
+"""
+import sys, time, colander
+from zope.interface.registry import Components
+
+from memphis import config
+
+
+def setup(groups, nodes):
+    data = {}
+    for g in range(groups):
+        schema = []
+        for n in range(nodes):
+            if n % 2:
+                node = config.SchemaNode(
+                    colander.Int(), name='node%s'%n, default=0)
+            else:
+                node = config.SchemaNode(
+                    colander.Str(), name='node%s'%n, default='')
+            schema.append(node)
+            data['group%s.node%s'%(g, n)] = str(n)
+        config.registerSettings('group%s'%g, *schema)
+
+    config.initialize(('memphis.config', __name__), reg=Components('bench'))
+    return config.Settings.schema.unflatten(data)
+
+
+def bench(func, repeat=10):
+    times = []
+    for i in range(repeat):
+        t = time.time()
+        func()
+        times.append(time.time() - t)
+    return min(times)
+
+
+def main(groups=50, nodes=100):
+    data = setup(groups, nodes)
+    schema = config.Settings.schema
+
+    def generic():
+        schema.deserialize(data)
+
+    def compiled():
+        config.Settings.compiled().deserialize(data)
+
+    assert schema.deserialize(data) == config.Settings.compiled()._deserialize(data)
+
+    print '%8s %12s %12s'%('keys', 'generic, s', 'compiled, s')
+    print '%8d %12.4f %12.4f'%(groups*nodes, bench(generic), bench(compiled))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,90 @@
+""" settings reload and export benchmark
+
+Registers settings groups with 5000 keys total and measures reload
+and export after single key change, full and incremental.
+
+  python benchmarks/bench_settings.py [groups] [nodes]
+"""
+import sys, time, colander
+from zope.interface.registry import Components
+
+from memphis import config
+
+
+class Loader(object):
+
+    def __init__(self, data):
+        self.data = data
+
+    def load(self):
+        return dict(self.data)
+
+    def loadDefaults(self):
+        return {}
+
+    def close(self):
+        pass
+
+
+def setup(groups, nodes):
+    data = {}
+    for g in range(groups):
+        schema = []
+        for n in range(nodes):
+            schema.append(config.SchemaNode(
+                    colander.Int(), name='node%s'%n, default=0))
+            data['group%s.node%s'%(g, n)] = str(n)
+        config.registerSettings('group%s'%g, *schema)
+
+    config.initialize(('memphis.config', __name__), reg=Components('bench'))
+    loader = Loader(data)
+    config.Settings.init(loader)
+    return loader
+
+
+def bench(func, repeat=10):
+    times = []
+    for i in range(repeat):
+        t = time.time()
+        func()
+        times.append(time.time() - t)
+    return min(times)
+
+
+def main(groups=50, nodes=100):
+    loader = setup(groups, nodes)
+    settings = config.Settings
+
+    state = {'val': 0}
+    def change():
+        state['val'] += 1
+        loader.data['group0.node0'] = str(state['val'])
+
+    def full():
+        change()
+        settings._load(loader.load(), suppressevents=False)
+
+    def incremental():
+        change()
+        settings.load()
+
+    group = settings['group0']
+
+    def export():
+        group['node0'] = group['node0'] + 1
+        settings._exported.clear()
+        settings.export()
+
+    def incrementalExport():
+        group['node0'] = group['node0'] + 1
+        settings.export()
+
+    print '%8s %10s %12s %16s'%('keys', '', 'full, s', 'incremental, s')
+    print '%8d %10s %12.4f %16.4f'%(
+        groups*nodes, 'reload', bench(full), bench(incremental))
+    print '%8d %10s %12.4f %16.4f'%(
+        groups*nodes, 'export', bench(export), bench(incrementalExport))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,57 @@
+""" initialize startup benchmark
+
+Each run is a fresh interpreter, time includes module imports.
+Compares full scan, warm manifest start and warm manifest start
+with ``skipImports`` (only modules with recorded actions are imported).
+
+  python benchmarks/bench_startup.py [repeat]
+"""
+import os, sys, time, tempfile, subprocess
+
+STARTUP = """
+import sys, time
+t = time.time()
+from memphis import config
+config.initialize(manifest=sys.argv[1] or None,
+                  skipImports=sys.argv[2] == 'skip')
+print time.time() - t, len(sys.modules)
+"""
+
+
+def run(manifest, mode=''):
+    output = subprocess.Popen(
+        [sys.executable, '-c', STARTUP, manifest, mode],
+        stdout=subprocess.PIPE).communicate()[0]
+    t, modules = output.strip().splitlines()[-1].split()
+    return float(t), int(modules)
+
+
+def main(repeat=10):
+    fd, manifest = tempfile.mkstemp()
+    os.close(fd)
+    os.unlink(manifest)
+    try:
+        run(manifest)
+
+        rows = (('full scan', '', ''),
+                ('manifest', manifest, ''),
+                ('manifest, skip', manifest, 'skip'))
+        # runs are interleaved, results are less affected by machine load
+        times = dict((title, []) for title, m, mode in rows)
+        modules = {}
+        for i in range(repeat):
+            for title, m, mode in rows:
+                t, modules[title] = run(m, mode)
+                times[title].append(t)
+
+        print '%-20s %10s %10s'%('', 'startup', 'modules')
+        for title, m, mode in rows:
+            print '%-20s %9.3fs %10d'%(
+                title, min(times[title]), modules[title])
+    finally:
+        if os.path.exists(manifest):
+            os.unlink(manifest)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
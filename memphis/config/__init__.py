@@ -1,41 +1,67 @@
-# memphis.config package public API
+# memphis.config package public API, names are imported on first access
 
 registry = None
 
-from memphis.config.api import initialize
-from memphis.config.api import notify
+from memphis.config.lazy import lazyModule
 
-from memphis.config.api import start
-from memphis.config.api import ApplicationStarting
-from memphis.config.api import StopException
+lazyModule(__name__, {
+    'include': 'memphis.config.api',
+    'initialize': 'memphis.config.api',
+    'freeze': 'memphis.config.api',
+    'thaw': 'memphis.config.api',
+    'notify': 'memphis.config.api',
 
-from memphis.config.api import loadPackages
+    'start': 'memphis.config.api',
+    'ApplicationStarting': 'memphis.config.api',
+    'StopException': 'memphis.config.api',
 
-from memphis.config.api import cleanUp
-from memphis.config.api import addCleanup
+    'loadPackages': 'memphis.config.api',
 
-from memphis.config.directives import event
-from memphis.config.directives import action
-from memphis.config.directives import adapter
-from memphis.config.directives import subscriber
+    'cleanUp': 'memphis.config.api',
+    'addCleanup': 'memphis.config.api',
+    'dispatchTable': 'memphis.config.api',
 
-from memphis.config.directives import Action
-from memphis.config.directives import ClassAction
-from memphis.config.directives import DirectiveInfo
-from memphis.config.directives import ConflictError
+    'event': 'memphis.config.directives',
+    'action': 'memphis.config.directives',
+    'adapter': 'memphis.config.directives',
+    'subscriber': 'memphis.config.directives',
 
-from memphis.config.settings import Settings
-from memphis.config.settings import FileStorage
-from memphis.config.settings import registerSettings
-from memphis.config.settings import initializeSettings
-from memphis.config.settings import SettingsInitialized
-from memphis.config.settings import SettingsInitializing
-from memphis.config.settings import SettingsGroupModified
+    'Action': 'memphis.config.directives',
+    'ClassAction': 'memphis.config.directives',
+    'DirectiveInfo': 'memphis.config.directives',
+    'ConflictError': 'memphis.config.directives',
 
-from memphis.config.shutdown import shutdown
-from memphis.config.shutdown import shutdownHandler
+    'Profiler': 'memphis.config.profiler',
 
-from memphis.config.schema import SchemaNode
-from memphis.config.schema import Mapping
-from memphis.config.schema import Sequence
-from memphis.config.schema import RequiredWithDependency
+    'Settings': 'memphis.config.settings',
+    'FileStorage': 'memphis.config.settings',
+    'SQLiteStorage': 'memphis.config.dbstorage',
+    'JournalStorage': 'memphis.config.journal',
+    'checkSettings': 'memphis.config.generation',
+    'BackgroundWriter': 'memphis.config.writer',
+    'WatchService': 'memphis.config.watch',
+    'watchService': 'memphis.config.watch',
+    'registerSettings': 'memphis.config.settings',
+    'initializeSettings': 'memphis.config.settings',
+    'SettingsInitialized': 'memphis.config.settings',
+    'SettingsInitializing': 'memphis.config.settings',
+    'SettingsGroupModified': 'memphis.config.settings',
+
+    'serve': 'memphis.config.prefork',
+    'preload': 'memphis.config.prefork',
+    'forkWorkers': 'memphis.config.prefork',
+    'forkHandler': 'memphis.config.prefork',
+    'ApplicationPreloaded': 'memphis.config.prefork',
+
+    'shutdown': 'memphis.config.shutdown',
+    'shutdownHandler': 'memphis.config.shutdown',
+
+    'SchemaNode': 'memphis.config.schema',
+    'Mapping': 'memphis.config.schema',
+    'Sequence': 'memphis.config.schema',
+    'RequiredWithDependency': 'memphis.config.schema',
+    })
+
+# configuration core is small, it is loaded eagerly to keep
+# import order of config modules
+import memphis.config.api
@@ -1,11 +1,22 @@
-import sys, pkg_resources
-from memphis.config import directives
+import sys
+from memphis.config import directives, discovery
+from memphis.config.cache import DispatchTable
+from memphis.config.frozen import FrozenRegistry
+from memphis.config.manifest import ActionManifest
+from zope.interface import providedBy
 from zope.interface.registry import Components
 from zope.interface.interface import adapter_hooks
 from zope.interface.interfaces import IObjectEvent
 
 mods = set()
 
+# scanned modules and executed actions of initialized registry
+_seen = None
+_executed = None
+
+# active startup profiler
+_profiler = None
+
 
 class StopException(Exception):
     """ Special initialization exception means stop execution """
@@ -27,16 +38,38 @@ class ApplicationStarting(object):
         self.config = config
 
 
-def initialize(packages=None, excludes=(), reg=None):
+def initialize(packages=None, excludes=(), reg=None, manifest=None,
+               profiler=None, prefetch=0, skipImports=False):
     """ Load memphis packages, scan and execute all configuration
-    directives. """
+    directives.
+
+    If ``manifest`` filename is set, scanned modules and resolved actions
+    are stored to this file and next initialization with same packages
+    and unchanged sources skips package walking and conflicts resolution.
+
+    If ``skipImports`` is set, initialization from manifest imports only
+    modules with recorded actions. Module level code of other scanned
+    modules is not executed, e.g. templates registered with
+    :py:func:`memphis.view.template` and :py:func:`addCleanup` handlers
+    of such modules are missing, so process differs from full scan one.
+
+    ``profiler`` is optional :py:class:`memphis.config.Profiler` instance,
+    it records startup timings until application start
+    (:py:class:`ApplicationStarting` event).
+
+    If ``prefetch`` is set, package files are read by ``prefetch`` threads
+    before modules are imported, import order doesn't change.
+    """
+
+    global _seen, _executed, _profiler
+
+    _profiler = profiler
 
     if reg is None:
         reg = Components('memphis')
         reg.registerHandler(objectEventNotify, (IObjectEvent,))
 
-    sys.modules['memphis.config'].registry = reg
-    sys.modules['memphis.config.api'].registry = reg
+    _setRegistry(reg)
 
     def exclude_filter(modname):
         if modname in packages:
@@ -50,22 +83,106 @@ def initialize(packages=None, excludes=(), reg=None):
     else:
         packages = loadPackages(packages, excludes=excludes)
 
-    # scan packages and load all actions
-    seen = set()
-    actions = []
+    executed = directives.DiscriminatorIndex()
+
+    actions = None
+    if manifest is not None:
+        manifest = ActionManifest(manifest, skipImports)
+        actions = manifest.load(packages, excludes)
+        if actions is not None:
+            modules = manifest.modules
+            executed.add(actions)
 
-    for pkg in packages:
-        actions.extend(directives.scan(pkg, seen, exclude_filter))
+    if actions is None:
+        # scan packages and load all actions
+        seen = set()
+        actions = []
+        modules = []
+
+        for pkg in packages:
+            actions.extend(
+                directives.scan(pkg, seen, exclude_filter, modules, prefetch))
+
+        actions = directives.resolveConflicts(actions, executed)
+
+        if manifest is not None:
+            manifest.save(packages, excludes, modules, actions)
 
     # execute actions
-    actions = directives.resolveConflicts(actions)
     for action in actions:
-        action()
+        if profiler is not None:
+            profiler.execute(action)
+        else:
+            action()
+
+    _seen = set(modules)
+    _executed = executed
+
+
+def include(packages, excludes=()):
+    """ Scan and execute configuration directives of additional packages
+    against already initialized registry. Conflicts are checked between
+    new actions and actions executed by previous initialization. """
+    if _seen is None:
+        raise RuntimeError("Configuration is not initialized.")
+
+    def exclude_filter(modname):
+        if modname in packages:
+            return True
+        return exclude(modname, excludes)
+
+    packages = loadPackages(packages, excludes=excludes)
+
+    frozen = isinstance(registry, FrozenRegistry)
+    if frozen:
+        thaw()
+
+    try:
+        actions = []
+        for pkg in packages:
+            actions.extend(directives.scan(pkg, _seen, exclude_filter))
+
+        for action in directives.resolveConflicts(actions, _executed):
+            action()
+    finally:
+        if frozen:
+            freeze()
+
+
+def freeze():
+    """ Replace active registry with read-only registry with precomputed
+    lookup tables. It should be called when application is configured,
+    registrations raise RuntimeError until :py:func:`thaw` is called. """
+    reg = sys.modules['memphis.config'].registry
+    if reg is None:
+        raise RuntimeError("Configuration is not initialized.")
+
+    if not isinstance(reg, FrozenRegistry):
+        _setRegistry(FrozenRegistry(reg))
+
+
+def thaw():
+    """ Restore mutable registry replaced by :py:func:`freeze` """
+    reg = sys.modules['memphis.config'].registry
+    if isinstance(reg, FrozenRegistry):
+        reg.close()
+        _setRegistry(reg.registry)
+
+
+def _setRegistry(reg):
+    sys.modules['memphis.config'].registry = reg
+    sys.modules['memphis.config.api'].registry = reg
+    dispatchTable.check(reg)
 
 
 def start(cfg):
+    global _profiler
+
     notify(ApplicationStarting(cfg))
 
+    # startup is finished
+    _profiler = None
+
 
 def exclude(modname, excludes=()):
     for n in ('.test','.ftest'):
@@ -86,20 +203,17 @@ def loadPackage(name, seen, first=True):
 
     seen.add(name)
 
-    try:
-        dist = pkg_resources.get_distribution(name)
-        for req in dist.requires():
-            pkg = req.project_name
+    index = discovery.getIndex()
+    dist = index.get(name)
+    if dist is not None:
+        for pkg in dist.requires():
             if pkg in seen:
                 continue
             packages.extend(loadPackage(pkg, seen, False))
 
-        distmap = pkg_resources.get_entry_map(dist, 'memphis')
-        ep = distmap.get('package')
+        ep = dist.get_entry_map('memphis').get('package')
         if ep is not None:
-            packages.append(ep.module_name)
-    except pkg_resources.DistributionNotFound:
-        pass
+            packages.append(ep)
 
     if first and name not in packages and '-' not in name:
         packages.append(name)
@@ -117,15 +231,14 @@ def loadPackages(include_packages=None, excludes=None):
                 continue
             packages.extend(loadPackage(pkg, seen))
     else:
-        for dist in pkg_resources.working_set:
+        for dist in discovery.getIndex():
             pkg = dist.project_name
             if pkg in seen:
                 continue
             if excludes and pkg in excludes:
                 continue
 
-            distmap = pkg_resources.get_entry_map(dist, 'memphis')
-            if 'package' in distmap:
+            if 'package' in dist.get_entry_map('memphis'):
                 packages.extend(loadPackage(pkg, seen))
             else:
                 seen.add(pkg)
@@ -133,17 +246,36 @@ def loadPackages(include_packages=None, excludes=None):
     return packages
 
 
+dispatchTable = DispatchTable()
+
 def notify(*event):
     """ Send event to event listeners """
-    registry.subscribers(event, None)
+    if _profiler is not None:
+        _profiler.notify(registry, event)
+    else:
+        _dispatch(event)
 
 
 def objectEventNotify(event):
-    registry.subscribers((event.object, event), None)
+    _dispatch((event.object, event))
+
+
+def _dispatch(objects):
+    # table hit path is inlined, table is dropped on registry change
+    required = tuple(map(providedBy, objects))
+    try:
+        handlers = dispatchTable.data[required]
+        dispatchTable.hits += 1
+    except KeyError:
+        handlers = dispatchTable.subscriptions(registry, required)
+
+    for handler in handlers:
+        handler(*objects)
 
 
 def adapterHook(iface, obj, name='', default=None):
-    return registry.queryAdapter(obj, iface, name, default)
+    # adapter registry lookup is cached by zope.interface
+    return registry.adapters.queryAdapter(obj, iface, name, default)
 
 adapter_hooks.append(adapterHook)
 
@@ -156,8 +288,15 @@ def addCleanup(handler):
 
 
 def cleanUp(*modIds):
+    global _seen, _executed, _profiler
+
+    thaw()
     mods.clear()
-    
+    _seen = None
+    _executed = None
+    _profiler = None
+    dispatchTable.clear()
+
     for h in _cleanups:
         h()
 
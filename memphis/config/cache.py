@@ -0,0 +1,87 @@
+""" bounded registry lookup caches """
+
+
+class LookupCache(object):
+    """ Adapter factories cache keyed by (required specs, provided
+    interface, name).
+
+    Cache is registered as subregistry of registry adapters, adapter
+    registry calls its ``changed`` hook when registry or one of its bases
+    changes and cache is dropped. Lookups don't check registry state,
+    cache is dropped when registry is replaced too. When cache reaches
+    ``size`` entries it is cleared. """
+
+    registry = None
+
+    def __init__(self, size=1000):
+        self.size = size
+        self.clear()
+
+    def clear(self):
+        """ Drop cached data and reset counters """
+        self.hits = 0
+        self.misses = 0
+        self.bind(None)
+
+    def bind(self, registry):
+        """ Drop cached data and watch changes of ``registry`` """
+        if self.registry is not None:
+            self.registry.adapters._removeSubregistry(self)
+
+        self.data = {}
+        self.registry = registry
+        if registry is not None:
+            registry.adapters._addSubregistry(self)
+
+    def changed(self, originally_changed=None):
+        """ Adapter registry change hook """
+        self.data = {}
+
+    def check(self, registry):
+        """ Drop cached data if registry has been replaced """
+        if registry is not self.registry:
+            self.bind(registry)
+
+    def lookup(self, registry, required, provided, name=u''):
+        self.check(registry)
+
+        key = (required, provided, name)
+        try:
+            factory = self.data[key]
+        except KeyError:
+            self.misses += 1
+            factory = registry.adapters.lookup(required, provided, name)
+            self._store(key, factory)
+        else:
+            self.hits += 1
+
+        return factory
+
+    def _store(self, key, value):
+        if len(self.data) >= self.size:
+            self.data = {}
+        self.data[key] = value
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses,
+                'size': len(self.data)}
+
+
+class DispatchTable(LookupCache):
+    """ Event subscribers dispatch table keyed by specifications
+    of event objects """
+
+    def subscriptions(self, registry, required):
+        self.check(registry)
+
+        try:
+            handlers = self.data[required]
+        except KeyError:
+            self.misses += 1
+            handlers = tuple(
+                registry.adapters.subscriptions(required, None))
+            self._store(required, handlers)
+        else:
+            self.hits += 1
+
+        return handlers
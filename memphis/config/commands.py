@@ -47,11 +47,28 @@ class SettingsCommand(object):
     parser.add_argument('-p', '--print', action="store_true",
                         dest='printcfg',
                         help = 'Print default settings in ConfigParser format')
+    parser.add_argument('--profile', action="store_true",
+                        dest='profile',
+                        help = 'Print initialization profile report')
+    parser.add_argument('--profile-json', action="store_true",
+                        dest='profilejson',
+                        help = 'Print initialization profile report as JSON')
 
     def __init__(self, args):
         self.options = args
 
     def run(self):
+        if self.options.profile or self.options.profilejson:
+            profiler = config.Profiler()
+            config.initialize(profiler=profiler)
+            config.initializeSettings({})
+
+            if self.options.profilejson:
+                print profiler.json()
+            else:
+                print profiler.report()
+            return
+
         # load all memphis packages
         config.initialize()
 
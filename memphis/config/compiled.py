@@ -0,0 +1,132 @@
+""" compiled settings schema deserialization """
+import colander
+from colander import null
+
+import schema
+
+
+class CompiledSchema(object):
+    """ Settings schema deserializer. Schema is compiled to list of
+    groups with precomputed deserializers for each setting. Nodes that
+    can't be compiled use generic ``deserialize``.
+
+    On any error deserialization is done again with generic colander
+    path, so errors are reported exactly as without compilation.
+    Compiled schema has to be rebuilt when schema or defaults change. """
+
+    def __init__(self, node):
+        self.schema = node
+        self.groups = [_compileGroup(group) for group in node.children]
+
+    def deserialize(self, cstruct):
+        try:
+            return self._deserialize(cstruct)
+        except Exception:
+            return self.schema.deserialize(cstruct)
+
+    def _deserialize(self, cstruct):
+        result = {}
+        for name, group, leaves, validator in self.groups:
+            gcstruct = cstruct.get(name, null)
+            if leaves is None or gcstruct is null:
+                result[name] = group.deserialize(gcstruct)
+                continue
+
+            appstruct = {}
+            for key, deserialize in leaves:
+                appstruct[key] = deserialize(gcstruct.get(key, null))
+
+            if validator is not None:
+                validator(group, appstruct)
+
+            result[name] = appstruct
+
+        return result
+
+
+def _compileGroup(group):
+    if type(group) is not schema.SchemaNode or \
+            not isinstance(group.typ, colander.Mapping) or \
+            group.typ.unknown != 'ignore' or \
+            group.preparer is not None:
+        return group.name, group, None, None
+
+    leaves = [(node.name, _compileNode(node)) for node in group.children]
+    return group.name, group, leaves, group.validator
+
+
+def _compileNode(node):
+    if type(node) is not schema.SchemaNode or node.children:
+        return node.deserialize
+
+    convert = _converter(node)
+    default = node.default
+    preparer = node.preparer
+    required = node.required
+    validator = node.validator
+
+    if preparer is None and validator is None and not required:
+        def deserialize(cstruct):
+            appstruct = convert(cstruct)
+            if appstruct is null:
+                return default
+            return appstruct
+
+        return deserialize
+
+    def deserialize(cstruct):
+        appstruct = convert(cstruct)
+        if appstruct is null:
+            appstruct = default
+
+        if preparer is not None:
+            appstruct = preparer(appstruct)
+
+        if required and appstruct == default:
+            raise schema.Required(node)
+
+        if validator is not None:
+            validator(node, appstruct)
+
+        return appstruct
+
+    return deserialize
+
+
+def _converter(node):
+    """ Inlined deserialization for common types, result is equal to
+    type ``deserialize``, errors are reported by generic path """
+    typ = node.typ
+    tp = type(typ)
+
+    if tp is schema.String:
+        encoding = typ.encoding
+
+        def convert(cstruct):
+            if not cstruct:
+                return null
+            if isinstance(cstruct, unicode):
+                return cstruct
+            if encoding:
+                return unicode(str(cstruct), encoding)
+            return unicode(cstruct)
+
+    elif tp is colander.Integer:
+        def convert(cstruct):
+            if cstruct != 0 and not cstruct:
+                return null
+            return int(cstruct)
+
+    elif tp is colander.Boolean:
+        def convert(cstruct):
+            if cstruct is null:
+                return null
+            return str(cstruct).lower() not in ('false', '0')
+
+    else:
+        deserialize = typ.deserialize
+
+        def convert(cstruct):
+            return deserialize(node, cstruct)
+
+    return convert
@@ -0,0 +1,112 @@
+""" sqlite settings storage """
+import os, logging, sqlite3, ConfigParser
+
+from settings import FileStorage
+
+log = logging.getLogger('memphis.config')
+
+
+class SQLiteStorage(FileStorage):
+    """ Settings storage in SQLite database, default settings are loaded
+    from ConfigParser file like in :py:class:`FileStorage`.
+
+    Only changed keys are written, every save increments storage
+    version in the same transaction. """
+
+    incremental = True
+
+    def __init__(self, cfg, cfgdefaults='', here = '',
+                 section=ConfigParser.DEFAULTSECT, watcherFactory=None,
+                 timeout=30.0):
+        super(SQLiteStorage, self).__init__(
+            cfg, cfgdefaults, here, section, watcherFactory)
+        self.timeout = timeout
+        self._created = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.cfg, self.timeout, isolation_level=None)
+        if not self._created:
+            conn.execute('CREATE TABLE IF NOT EXISTS settings ('
+                         'section TEXT, key TEXT, value TEXT, '
+                         'PRIMARY KEY (section, key))')
+            conn.execute('CREATE TABLE IF NOT EXISTS version ('
+                         'section TEXT PRIMARY KEY, version INTEGER)')
+            self._created = True
+        return conn
+
+    def version(self):
+        """ Storage version, it is changed by every save """
+        if not self.cfg or not os.path.exists(self.cfg):
+            return 0
+
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT version FROM version WHERE section=?',
+                               (self.section,)).fetchone()
+            return row[0] if row else 0
+        finally:
+            conn.close()
+
+    def load(self):
+        if not self.cfg:
+            return {}
+
+        log.info("Loading settings: %s"%self.cfg)
+        conn = self._connect()
+        try:
+            data = dict(conn.execute(
+                    'SELECT key, value FROM settings WHERE section=?',
+                    (self.section,)))
+        finally:
+            conn.close()
+
+        self._startWatcher(self.cfg)
+        return data
+
+    def save(self, data, changed=None):
+        """ Save settings. ``changed`` is list of changed settings names,
+        if it is None all settings are replaced. Changed names without
+        value in ``data`` are removed (value is equal to default) """
+        if not self.cfg:
+            return
+
+        log.info("Saving settings: %s"%self.cfg)
+
+        section = self.section
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                if changed is None:
+                    conn.execute('DELETE FROM settings WHERE section=?',
+                                 (section,))
+                    items = data.items()
+                else:
+                    items = []
+                    for name in changed:
+                        conn.execute(
+                            'DELETE FROM settings WHERE section=? AND '
+                            '(key=? OR substr(key, 1, ?)=?)',
+                            (section, name, len(name)+1, name+'.'))
+                        prefix = name + '.'
+                        items.extend(
+                            (key, val) for key, val in data.items()
+                            if key == name or key.startswith(prefix))
+
+                conn.executemany(
+                    'INSERT OR REPLACE INTO settings VALUES (?, ?, ?)',
+                    [(section, key, val) for key, val in items])
+
+                conn.execute(
+                    'INSERT OR IGNORE INTO version VALUES (?, 0)', (section,))
+                conn.execute(
+                    'UPDATE version SET version=version+1 WHERE section=?',
+                    (section,))
+            except:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+        finally:
+            conn.close()
+
+        self._saved()
@@ -1,5 +1,5 @@
 """ directives """
-import sys, inspect, imp, logging
+import os, sys, imp, logging, linecache, threading, Queue
 from zope import interface
 from pkgutil import walk_packages
 
@@ -139,8 +139,9 @@ class Action(object):
 
     @property
     def discriminator(self):
+        # callable discriminator is computed once, on first access
         if callable(self._discriminator):
-            return self._discriminator(self)
+            self._discriminator = self._discriminator(self)
         return self._discriminator
 
     def __call__(self):
@@ -180,10 +181,17 @@ class DirectiveInfo(object):
         self.locals = f_locals
         self.scope = scope
         self.module = module
-        self.codeinfo = codeinfo
+        self.filename, self.lineno, self.function = codeinfo
 
         api.mods.add(self.module.__name__)
 
+    @property
+    def codeinfo(self):
+        """ (filename, lineno, function, source), source line is read
+        only when it is requested, usually by ConflictError """
+        source = linecache.getline(self.filename, self.lineno).strip()
+        return self.filename, self.lineno, self.function, source
+
     @property
     def context(self):
         if self.scope == 'module':
@@ -200,9 +208,10 @@ class DirectiveInfo(object):
 
 def getFrameInfo(frame):
     """code from venusian package
-    Return (kind,module,locals,globals) for a frame
+    Return (kind,module,locals,globals,codeinfo) for a frame
 
     'kind' is one of "exec", "module", "class", "function call", or "unknown".
+    'codeinfo' is (filename, lineno, function), source line is not loaded.
     """
 
     f_locals = frame.f_locals
@@ -219,13 +228,8 @@ def getFrameInfo(frame):
 
     namespaceIsModule = module and module.__dict__ is f_globals
 
-    frameinfo = inspect.getframeinfo(frame)
-    try:
-        sourceline = frameinfo[3][0].strip()
-    except: # pragma: no cover
-        sourceline = frameinfo[3]
-
-    codeinfo = frameinfo[0], frameinfo[1], frameinfo[2], sourceline
+    code = frame.f_code
+    codeinfo = code.co_filename, frame.f_lineno, code.co_name
 
     if not namespaceIsModule: # pragma: no cover
         # some kind of funky exec
@@ -243,10 +247,70 @@ def getFrameInfo(frame):
     return kind, module, f_locals, f_globals, codeinfo
 
 
-def scan(package, seen, exclude_filter=None):
+def _import(modname):
+    if api._profiler is not None:
+        return api._profiler.importModule(modname)
+
+    __import__(modname)
+    return sys.modules[modname]
+
+
+PREFETCH_EXTENSIONS = ('.py', '.pyc', '.pyo', '.so')
+
+
+def _read(path):
+    try:
+        f = open(path, 'rb')
+        try:
+            while f.read(65536):
+                pass
+        finally:
+            f.close()
+    except IOError: # pragma: no cover
+        pass
+
+
+def prefetchFiles(paths, threads=4):
+    """ Read source and bytecode files of package directories in thread
+    pool, so following serial import finds them in OS cache. """
+    files = []
+    for path in paths:
+        for dirpath, dirnames, filenames in os.walk(path):
+            for name in filenames:
+                if os.path.splitext(name)[1] in PREFETCH_EXTENSIONS:
+                    files.append(os.path.join(dirpath, name))
+
+    if not files:
+        return files
+
+    queue = Queue.Queue()
+    for path in files:
+        queue.put(path)
+
+    def worker():
+        while True:
+            try:
+                path = queue.get_nowait()
+            except Queue.Empty:
+                return
+            _read(path)
+
+    workers = [threading.Thread(target=worker)
+               for i in range(min(threads, len(files)))]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+
+    return files
+
+
+def scan(package, seen, exclude_filter=None, modules=None, prefetch=0):
+    """ Import package and all its submodules and return list of
+    registered actions. If ``prefetch`` is set, package files are read
+    by ``prefetch`` threads before serial import """
     if isinstance(package, basestring):
-        __import__(package)
-        package = sys.modules[package]
+        package = _import(package)
 
     actions = []
 
@@ -255,11 +319,16 @@ def scan(package, seen, exclude_filter=None):
         return actions
 
     seen.add(pkgname)
+    if modules is not None:
+        modules.append(pkgname)
 
     if pkgname in ACTIONS:
         actions.extend(ACTIONS[pkgname])
 
     if hasattr(package, '__path__'): # package, not module
+        if prefetch:
+            prefetchFiles(package.__path__, prefetch)
+
         results = walk_packages(package.__path__, package.__name__+'.')
 
         for importer, modname, ispkg in results:
@@ -276,50 +345,73 @@ def scan(package, seen, exclude_filter=None):
             if loader is not None:
                 module_type = loader.etc[2]
                 if module_type in (imp.PY_SOURCE, imp.PKG_DIRECTORY):
-                    __import__(modname)
-                    module = sys.modules[modname]
+                    _import(modname)
+                    if modules is not None:
+                        modules.append(modname)
                     if modname in ACTIONS:
                         actions.extend(ACTIONS[modname])
 
     return actions
 
 
-def resolveConflicts(actions):
-    # code from zope.configuration package
+class DiscriminatorIndex(dict):
+    """ discriminator -> action mapping of resolved actions, it can be
+    passed to later resolveConflicts calls """
+
+    def add(self, actions):
+        for action in actions:
+            self[action.discriminator] = action
+
+
+def resolveConflicts(actions, index=None):
+    """ Check actions for conflicts and return actions in execution order.
+
+    Each discriminator is computed once. If ``index`` is given, actions
+    are also checked against already resolved actions and are added
+    to index. """
 
-    # organize actions by discriminators
     unique = {}
+    conflicts = {}
     output = []
-    for i in range(len(actions)):
-        action = actions[i]
+    for i, action in enumerate(actions):
         discriminator = action.discriminator
+        item = (action.info.filename, action.order or i, action)
 
-        order = action.order or i
-        a = unique.setdefault(discriminator, [])
-        a.append((action.info.codeinfo[0], order, action))
+        if discriminator in unique:
+            dups = conflicts.get(discriminator)
+            if dups is None:
+                dups = conflicts[discriminator] = [unique[discriminator]]
+            dups.append(item)
+            continue
 
-    # Check for conflicts
-    conflicts = {}
-    for discriminator, dups in unique.items():
-        # We need to sort the actions by the paths so that the shortest
-        # path with a given prefix comes first:
-        dups.sort()
-        basepath, order, action = dups[0]
+        unique[discriminator] = item
+        output.append(item)
 
-        output.append((order, action))
-        if len(dups) > 1:
-            conflicts[discriminator] = [action.info for _i1, _i2, action in dups]
+    if index:
+        for discriminator, item in unique.items():
+            if discriminator in index:
+                existing = index[discriminator]
+                conflicts.setdefault(discriminator, [item]).insert(
+                    0, (existing.info.filename, existing.order, existing))
 
     if conflicts:
+        # report actions sorted by path, shortest path with
+        # a given prefix comes first
+        for discriminator, dups in conflicts.items():
+            dups.sort(key=lambda item: item[:2])
+            conflicts[discriminator] = [action.info for _p, _o, action in dups]
         raise ConflictError(conflicts)
 
-    # Now put the output back in the original order, and return it:
-    r = []
-    output.sort()
-    for order, action in output:
-        r.append(action)
+    # actions are already in original order, except actions with
+    # explicit order, so this sort is linear in most cases
+    output.sort(key=lambda item: item[1])
+    output = [action for _p, _o, action in output]
+
+    if index is not None:
+        for action in output:
+            index[action.discriminator] = action
 
-    return r
+    return output
 
 
 class ConflictError(TypeError):
@@ -0,0 +1,196 @@
+""" memphis packages discovery
+
+Lightweight replacement for pkg_resources working set scans. Installed
+distributions are found by listing sys.path entries, distribution metadata
+(requirements, entry points, version) is read only when it is requested.
+"""
+import os, re, sys, zipfile
+
+_name_re = re.compile(r'[A-Za-z0-9][A-Za-z0-9._-]*')
+
+
+def safe_name(name):
+    """ Convert an arbitrary string to a standard distribution name """
+    return re.sub('[^A-Za-z0-9.]+', '-', name)
+
+
+def key(name):
+    return safe_name(name).lower()
+
+
+class Distribution(object):
+    """ Installed distribution metadata """
+
+    def __init__(self, project_name, location, metadata, version=None):
+        self.project_name = project_name
+        self.key = project_name.lower()
+        self.location = location
+        self.metadata = metadata
+        self._version = version
+
+    def __repr__(self):
+        return '<Distribution %s (%s)>'%(self.project_name, self.location)
+
+    def read(self, name):
+        """ Read metadata file, returns None if file doesn't exist """
+        if not os.path.isdir(self.location) and \
+                zipfile.is_zipfile(self.location):
+            try:
+                zf = zipfile.ZipFile(self.location)
+                try:
+                    return zf.read('%s/%s'%(self.metadata, name))
+                finally:
+                    zf.close()
+            except KeyError:
+                return None
+
+        path = os.path.join(self.location, self.metadata, name)
+        if os.path.isfile(path):
+            f = open(path, 'rb')
+            try:
+                return f.read()
+            finally:
+                f.close()
+        return None
+
+    @property
+    def version(self):
+        if self._version is None:
+            data = self.read('PKG-INFO') or self.read('METADATA') or ''
+            for line in data.splitlines():
+                if line.startswith('Version:'):
+                    self._version = line[8:].strip()
+                    break
+            else:
+                self._version = ''
+        return self._version
+
+    def requires(self):
+        """ List of required project names, extras are ignored """
+        if '_requires' not in self.__dict__:
+            names = []
+            data = self.read('requires.txt')
+            if data is not None:
+                for line in data.splitlines():
+                    line = line.strip()
+                    if line.startswith('['):
+                        # extras are skipped, markers sections are included
+                        if not line.startswith('[:'):
+                            break
+                        continue
+                    match = _name_re.match(line)
+                    if match is not None:
+                        names.append(safe_name(match.group()))
+            else:
+                data = self.read('METADATA') or ''
+                for line in data.splitlines():
+                    if not line.startswith('Requires-Dist:'):
+                        continue
+                    line = line[14:].strip()
+                    if 'extra ==' in line or 'extra==' in line:
+                        continue
+                    match = _name_re.match(line)
+                    if match is not None:
+                        names.append(safe_name(match.group()))
+            self._requires = names
+        return self._requires
+
+    def get_entry_map(self, group):
+        """ Entry points group, entry point name -> module name """
+        if '_entry_points' not in self.__dict__:
+            self._entry_points = entry_points = {}
+            section = None
+            for line in (self.read('entry_points.txt') or '').splitlines():
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                if line.startswith('['):
+                    section = entry_points.setdefault(line.strip('[]'), {})
+                elif section is not None and '=' in line:
+                    name, value = line.split('=', 1)
+                    section[name.strip()] = value.split(':', 1)[0].strip()
+        return self._entry_points.get(group, {})
+
+
+class DistributionIndex(object):
+    """ Installed distributions in path order, first found distribution
+    with a given name wins like in pkg_resources working set """
+
+    def __init__(self, path=None):
+        if path is None:
+            path = sys.path
+
+        self.dists = []
+        self.bykey = {}
+
+        for entry in path:
+            for dist in self._find(entry or os.curdir):
+                if dist.key not in self.bykey:
+                    self.bykey[dist.key] = dist
+                    self.dists.append(dist)
+
+    def __iter__(self):
+        return iter(self.dists)
+
+    def get(self, name):
+        return self.bykey.get(key(name))
+
+    def _find(self, entry, fromlink=False):
+        entry = os.path.normcase(os.path.abspath(entry))
+
+        if entry.lower().endswith('.egg'):
+            if os.path.isdir(os.path.join(entry, 'EGG-INFO')) or \
+                    zipfile.is_zipfile(entry):
+                name = os.path.basename(entry)[:-4]
+                yield self._dist(name, entry, 'EGG-INFO')
+            return
+
+        if not os.path.isdir(entry):
+            return
+
+        try:
+            items = sorted(os.listdir(entry))
+        except OSError: # pragma: no cover
+            return
+
+        for item in items:
+            lower = item.lower()
+            if lower.endswith('.egg-info') or lower.endswith('.dist-info'):
+                name = item.rsplit('.', 1)[0]
+                yield self._dist(name, entry, item)
+            elif lower.endswith('.egg'):
+                for dist in self._find(os.path.join(entry, item)):
+                    yield dist
+            elif lower.endswith('.egg-link') and not fromlink:
+                try:
+                    f = open(os.path.join(entry, item))
+                    try:
+                        link = f.readline().strip()
+                    finally:
+                        f.close()
+                except IOError: # pragma: no cover
+                    continue
+                if link:
+                    for dist in self._find(
+                            os.path.join(entry, link), True):
+                        yield dist
+
+    def _dist(self, name, location, metadata):
+        parts = name.split('-')
+        version = None
+        if len(parts) > 1:
+            version = parts[1].replace('_', '-')
+        return Distribution(safe_name(parts[0]), location, metadata, version)
+
+
+_index = None
+
+def getIndex():
+    """ Distributions index for current sys.path """
+    global _index
+
+    path = tuple(sys.path)
+    if _index is None or _index[0] != path:
+        _index = (path, DistributionIndex(path))
+
+    return _index[1]
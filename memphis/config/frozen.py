@@ -0,0 +1,123 @@
+""" frozen, lookup-optimized registry """
+from zope.interface import providedBy
+from memphis.config.cache import LookupCache
+
+
+class FrozenRegistry(object):
+    """ Read-only components registry with precomputed lookup tables.
+
+    Utilities table maps provided interface and name of every registered
+    utility (and interfaces it extends) to utility, it is built on freeze.
+    Adapter factories are resolved once per (required specs, provided
+    interface, name) and stored in bounded table. Lookups don't check
+    registry state, tables are rebuilt by registry change hooks if
+    original registry is changed.
+
+    Registration methods raise RuntimeError, ``registry`` attribute
+    is original mutable registry. Registry has to be closed when it
+    is not used anymore. """
+
+    def __init__(self, registry, size=10000):
+        self.registry = registry
+        self.adapters = registry.adapters
+        self.utilities = registry.utilities
+
+        self._adapters = LookupCache(size)
+        self._adapters.bind(self)
+        registry.utilities._addSubregistry(self)
+        self.compile()
+
+    def compile(self):
+        """ Build utilities table """
+        table = {}
+        utilities = self.utilities
+        for reg in utilities.ro:
+            if not reg._adapters:
+                continue
+
+            for provided, names in reg._adapters[0].items():
+                for iface in provided.__iro__:
+                    for name in names:
+                        key = (iface, name)
+                        if key not in table:
+                            component = utilities.lookup((), iface, name)
+                            if component is not None:
+                                table[key] = component
+
+        self._utilities = table
+
+    def changed(self, originally_changed=None):
+        """ Utility registry change hook """
+        self.compile()
+
+    def close(self):
+        """ Stop watching original registry changes """
+        self.utilities._removeSubregistry(self)
+        self._adapters.bind(None)
+
+    def __repr__(self):
+        return '<FrozenRegistry %r>'%self.registry
+
+    def __getattr__(self, name):
+        return getattr(self.registry, name)
+
+    def _frozen(self, *args, **kw):
+        raise RuntimeError(
+            "Registry is frozen, use memphis.config.thaw() "
+            "to get mutable registry.")
+
+    registerUtility = unregisterUtility = _frozen
+    registerAdapter = unregisterAdapter = _frozen
+    registerHandler = unregisterHandler = _frozen
+    registerSubscriptionAdapter = unregisterSubscriptionAdapter = _frozen
+
+    def queryUtility(self, provided, name=u'', default=None):
+        return self._utilities.get((provided, name), default)
+
+    def getUtility(self, provided, name=u''):
+        try:
+            return self._utilities[(provided, name)]
+        except KeyError:
+            return self.registry.getUtility(provided, name)
+
+    def queryAdapter(self, object, interface, name=u'', default=None):
+        required = (providedBy(object),)
+        try:
+            factory = self._adapters.data[(required, interface, name)]
+        except KeyError:
+            factory = self._adapters.lookup(self, required, interface, name)
+
+        if factory is None:
+            return default
+
+        result = factory(object)
+        if result is None:
+            return default
+        return result
+
+    def getAdapter(self, object, interface, name=u''):
+        adapter = self.queryAdapter(object, interface, name)
+        if adapter is None:
+            return self.registry.getAdapter(object, interface, name)
+        return adapter
+
+    def queryMultiAdapter(self, objects, interface, name=u'', default=None):
+        required = tuple(map(providedBy, objects))
+        try:
+            factory = self._adapters.data[(required, interface, name)]
+        except KeyError:
+            factory = self._adapters.lookup(self, required, interface, name)
+
+        if factory is None:
+            return default
+
+        result = factory(*objects)
+        if result is None:
+            return default
+        return result
+
+    def getMultiAdapter(self, objects, interface, name=u''):
+        adapter = self.queryMultiAdapter(objects, interface, name)
+        if adapter is None:
+            return self.registry.getMultiAdapter(objects, interface, name)
+        return adapter
@@ -0,0 +1,104 @@
+""" cross-process settings change propagation """
+import os, mmap, fcntl, struct, logging
+
+import api
+from directives import subscriber
+
+log = logging.getLogger('memphis.config')
+
+_watchers = []
+
+
+class GenerationCounter(object):
+    """ Memory mapped 64bit counter shared by all processes
+    that use same file """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.fd = os.open(filename, os.O_RDWR | os.O_CREAT, 0644)
+        if os.fstat(self.fd).st_size < 8:
+            os.ftruncate(self.fd, 8)
+        self.map = mmap.mmap(self.fd, 8)
+
+    def value(self):
+        return struct.unpack('Q', self.map[:8])[0]
+
+    def increment(self):
+        fcntl.lockf(self.fd, fcntl.LOCK_EX)
+        try:
+            value = self.value() + 1
+            self.map[:8] = struct.pack('Q', value)
+        finally:
+            fcntl.lockf(self.fd, fcntl.LOCK_UN)
+        return value
+
+    def close(self):
+        self.map.close()
+        os.close(self.fd)
+
+
+class GenerationWatcher(object):
+    """ Settings watcher without notifier thread. Storage increments
+    generation counter on save, other processes reload settings on
+    next :py:func:`checkSettings` call if generation has been changed """
+
+    counter = None
+    filename = ''
+
+    def __init__(self, handler):
+        self._handler = handler
+
+    def start(self, filename):
+        if self.filename == filename:
+            return
+
+        self.stop()
+        self.filename = filename
+        self.counter = GenerationCounter('%s.generation'%filename)
+        self.generation = self.counter.value()
+        _watchers.append(self)
+
+    def stop(self):
+        if self.counter is not None:
+            _watchers.remove(self)
+            self.counter.close()
+            self.counter = None
+            self.filename = ''
+
+    def saved(self):
+        """ Settings has been saved by this process """
+        if self.counter is not None:
+            generation = self.counter.increment()
+
+            # changes of other processes since last check are not
+            # loaded yet, they are reloaded on next check
+            if generation - 1 == self.generation:
+                self.generation = generation
+
+    def check(self):
+        generation = self.counter.value()
+        if generation != self.generation:
+            self.generation = generation
+
+            log.info("Settings generation changed: %s", self.filename)
+            self._handler()
+
+
+def checkSettings(*args):
+    """ Reload settings if they have been changed by other process.
+    It is called on every pyramid request, but it can be used as
+    event subscriber or called directly by non-pyramid processes. """
+    for watcher in _watchers:
+        watcher.check()
+
+
+@subscriber(api.ApplicationStarting)
+def startRequestCheck(ev):
+    if hasattr(ev.config, 'add_subscriber'):
+        ev.config.add_subscriber(checkSettings, 'pyramid.events.NewRequest')
+
+
+@api.addCleanup
+def cleanup():
+    for watcher in list(_watchers):
+        watcher.stop()
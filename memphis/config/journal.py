@@ -0,0 +1,241 @@
+""" append-only settings journal storage """
+import os, json, fcntl, logging, threading, ConfigParser
+from collections import OrderedDict
+
+from settings import FileStorage
+
+log = logging.getLogger('memphis.config')
+
+HEADER = '#'
+
+
+class JournalStorage(FileStorage):
+    """ Settings storage that appends changed settings to journal file
+    next to ConfigParser base file. Loading replays journal over base
+    file. Journal is folded into base file by background compaction when
+    it becomes bigger than ``compactSize`` bytes.
+
+    Journal starts with header record with compaction number, it is used
+    to read only records appended after previous load. """
+
+    incremental = True
+
+    def __init__(self, cfg, cfgdefaults='', here = '',
+                 section=ConfigParser.DEFAULTSECT, watcherFactory=None,
+                 compactSize=65536):
+        super(JournalStorage, self).__init__(
+            cfg, cfgdefaults, here, section, watcherFactory)
+        self.journal = '%s.journal'%cfg
+        self.compactSize = compactSize
+
+        self._data = None
+        self._compaction = None
+        self._offset = 0
+        self._compactor = None
+
+    def _startWatcher(self, fn):
+        # base file is changed only by compaction, it changes journal too
+        super(JournalStorage, self)._startWatcher(self.journal)
+
+    def _open(self, mode, lock):
+        fp = open(self.journal, mode)
+        fcntl.lockf(fp.fileno(), lock)
+        return fp
+
+    def _header(self, fp):
+        fp.seek(0)
+        line = fp.readline()
+        if not line.endswith('\n'):
+            return None, 0
+
+        try:
+            key, compaction = json.loads(line)
+        except ValueError:
+            return None, 0
+
+        if key != HEADER:
+            return None, 0
+        return compaction, len(line)
+
+    def _replay(self, fp, data):
+        for key, value, size in _records(fp, self._offset):
+            self._offset += size
+            if key is not None:
+                _apply(data, key, value)
+
+    def _base(self):
+        parser = ConfigParser.ConfigParser(dict_type=OrderedDict)
+        parser.read(self.cfg)
+
+        if self.section != ConfigParser.DEFAULTSECT and \
+                not parser.has_section(self.section):
+            parser.add_section(self.section)
+        return parser
+
+    def load(self):
+        if not self.cfg:
+            return {}
+
+        if self._data is not None and os.path.exists(self.journal):
+            fp = self._open('rb', fcntl.LOCK_SH)
+            try:
+                compaction, offset = self._header(fp)
+                if compaction is not None and compaction == self._compaction:
+                    self._replay(fp, self._data)
+                    self._startWatcher(self.journal)
+                    return dict(self._data)
+            finally:
+                fp.close()
+
+        fp = self._open('a+b', fcntl.LOCK_EX)
+        try:
+            data = super(JournalStorage, self).load()
+
+            compaction, offset = self._header(fp)
+            if compaction is None:
+                fp.seek(0)
+                fp.truncate(0)
+                fp.write('%s\n'%json.dumps([HEADER, 0]))
+                fp.flush()
+                compaction, offset = self._header(fp)
+
+            self._compaction = compaction
+            self._offset = offset
+            self._replay(fp, data)
+            self._data = data
+        finally:
+            fp.close()
+
+        return dict(data)
+
+    def save(self, data, changed=None):
+        """ Append changed settings to journal. ``changed`` is list of
+        changed settings names, if it is None all settings are replaced """
+        if not self.cfg:
+            return
+
+        if changed is None:
+            self.compact(data)
+            return
+
+        records = []
+        for name in changed:
+            prefix = name + '.'
+            items = [(key, val) for key, val in data.items()
+                     if key == name or key.startswith(prefix)]
+
+            # value is equal to default or nested values can be removed
+            if name not in data:
+                records.append([name, None])
+
+            records.extend([key, val] for key, val in sorted(items))
+
+        if not records:
+            return
+
+        log.info("Saving settings: %s"%self.journal)
+
+        fp = self._open('a+b', fcntl.LOCK_EX)
+        try:
+            fp.seek(0, os.SEEK_END)
+            fp.write(''.join(
+                    '%s\n'%json.dumps(record) for record in records))
+            fp.flush()
+            size = fp.tell()
+        finally:
+            fp.close()
+
+        self._saved()
+
+        if size > self.compactSize and \
+                (self._compactor is None or not self._compactor.is_alive()):
+            self._compactor = threading.Thread(target=self.compact)
+            self._compactor.daemon = True
+            self._compactor.start()
+
+    def compact(self, data=None):
+        """ Fold journal into base file, if ``data`` is not None it
+        replaces all settings """
+        if not self.cfg:
+            return
+
+        log.info("Compacting settings journal: %s"%self.journal)
+
+        fp = self._open('a+b', fcntl.LOCK_EX)
+        try:
+            parser = self._base()
+            section = self.section
+
+            compaction, offset = self._header(fp)
+
+            if data is None:
+                for key, value, size in _records(fp, offset):
+                    if key is None:
+                        continue
+                    elif value is None:
+                        _remove(parser, section, key)
+                    else:
+                        parser.set(section, key, value)
+            else:
+                if section == ConfigParser.DEFAULTSECT:
+                    parser.defaults().clear()
+                else:
+                    parser.remove_section(section)
+                    parser.add_section(section)
+
+                for key, value in sorted(data.items()):
+                    parser.set(section, key, value)
+
+            tmp = '%s.tmp'%self.cfg
+            f = open(tmp, 'wb')
+            try:
+                parser.write(f)
+            finally:
+                f.close()
+            os.rename(tmp, self.cfg)
+
+            fp.seek(0)
+            fp.truncate(0)
+            fp.write('%s\n'%json.dumps([HEADER, (compaction or 0) + 1]))
+            fp.flush()
+        finally:
+            fp.close()
+
+        self._saved()
+
+
+def _records(fp, offset):
+    # incomplete record is left for next read
+    fp.seek(offset)
+    for line in fp:
+        if not line.endswith('\n'):
+            break
+
+        try:
+            key, value = json.loads(line)
+        except ValueError:
+            log.error("Broken settings journal record: %r", line)
+            key = value = None
+
+        yield key, value, len(line)
+
+
+def _apply(data, key, value):
+    if value is None:
+        prefix = key + '.'
+        for k in [k for k in data if k == key or k.startswith(prefix)]:
+            del data[k]
+    else:
+        data[key] = value
+
+
+def _remove(parser, section, key):
+    if section == ConfigParser.DEFAULTSECT:
+        options = parser.defaults().keys()
+    else:
+        options = parser.options(section)
+
+    prefix = key + '.'
+    for k in options:
+        if k == key or k.startswith(prefix):
+            parser.remove_option(section, k)
@@ -0,0 +1,77 @@
+""" lazy package namespaces """
+import sys, imp
+from types import ModuleType
+
+
+class LazyModule(ModuleType):
+    """ Package module, public names are imported from submodules on
+    first access. Submodules are available as attributes too. """
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+
+        api = self.__dict__['_lazyapi']
+        if name in api:
+            value = getattr(_import(api[name]), name)
+            if name not in self.__dict__['_lazyclashes']:
+                self.__dict__[name] = value
+            return value
+
+        # submodule
+        try:
+            imp.find_module(name, self.__dict__['__path__'])
+        except ImportError:
+            raise AttributeError(name)
+
+        return _import('%s.%s'%(self.__name__, name))
+
+
+def _import(modname):
+    __import__(modname)
+    return sys.modules[modname]
+
+
+def _clash(name, modname):
+    # import system stores submodule in package __dict__ when submodule
+    # is loaded, data descriptor on type takes precedence over __dict__
+    def get(self):
+        try:
+            return self.__dict__['_lazyvalues'][name]
+        except KeyError:
+            value = getattr(_import(modname), name)
+            self.__dict__['_lazyvalues'][name] = value
+            return value
+
+    def set(self, value):
+        self.__dict__['_lazyvalues'][name] = value
+
+    return property(get, set)
+
+
+def lazyModule(modname, api):
+    """ Replace package module in ``sys.modules`` with lazy module.
+    ``api`` is mapping of public name to module name. """
+    module = sys.modules[modname]
+
+    clashes = {}
+    for path in module.__path__:
+        for name, mod in api.items():
+            try:
+                imp.find_module(name, [path])
+            except ImportError:
+                continue
+            clashes[name] = _clash(name, mod)
+
+    cls = type('LazyModule', (LazyModule,), clashes)
+    lazy = cls(modname, module.__doc__)
+    lazy.__dict__.update(module.__dict__)
+    lazy.__dict__.update({
+        '__all__': sorted(api),
+        '_lazyapi': api,
+        '_lazyclashes': frozenset(clashes),
+        '_lazyvalues': {},
+        '_lazymodule': module})
+
+    sys.modules[modname] = lazy
+    return lazy
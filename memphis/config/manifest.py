@@ -0,0 +1,138 @@
+""" persistent action manifest """
+import os, sys, logging, cPickle
+
+import directives, discovery
+
+log = logging.getLogger('memphis.config')
+
+MANIFEST_VERSION = 1
+
+
+class ActionManifest(object):
+    """ On-disk record of scanned modules and resolved actions order.
+
+    Manifest is keyed by scanned packages, installed distribution versions
+    and mtimes of scanned modules and package directories. If anything
+    changed ``load`` returns None and caller has to do full scan. """
+
+    modules = ()
+
+    def __init__(self, filename, skipImports=False):
+        self.filename = filename
+        self.skipImports = skipImports
+
+    def load(self, packages, excludes=()):
+        """ Import recorded modules and return resolved actions list.
+        If ``skipImports`` is set, only modules with actions are
+        imported. """
+        if not self.filename or not os.path.exists(self.filename):
+            return None
+
+        try:
+            f = open(self.filename, 'rb')
+            try:
+                data = cPickle.load(f)
+            finally:
+                f.close()
+        except Exception, e:
+            log.warning("Can't read actions manifest %s: %s", self.filename, e)
+            return None
+
+        if data.get('version') != MANIFEST_VERSION or \
+                data.get('key') != self._key(packages, excludes):
+            log.info("Actions manifest is outdated: %s", self.filename)
+            return None
+
+        for path, mtime in data['mtimes'].items():
+            try:
+                if os.stat(path).st_mtime != mtime:
+                    log.info("Actions manifest is outdated: %s", self.filename)
+                    return None
+            except OSError:
+                return None
+
+        # modules without actions are not imported with skipImports,
+        # their mtimes are checked above
+        counts = data['counts']
+        for modname in data['modules']:
+            if not self.skipImports or modname in counts:
+                __import__(modname)
+
+        for modname, count in counts.items():
+            if len(directives.ACTIONS.get(modname, ())) != count:
+                log.info("Actions manifest doesn't match "
+                         "registered actions: %s", modname)
+                return None
+
+        log.info("Loading actions from manifest: %s", self.filename)
+        self.modules = data['modules']
+        return [directives.ACTIONS[modname][idx]
+                for modname, idx in data['actions']]
+
+    def save(self, packages, excludes, modules, actions):
+        """ Save scanned modules and resolved actions """
+        if not self.filename:
+            return
+
+        positions = {}
+        counts = {}
+        for modname in modules:
+            data = directives.ACTIONS.get(modname)
+            if data:
+                counts[modname] = len(data)
+                for idx, action in enumerate(data):
+                    positions[id(action)] = (modname, idx)
+
+        try:
+            resolved = [positions[id(action)] for action in actions]
+        except KeyError: # pragma: no cover
+            log.warning("Can't build actions manifest, "
+                        "action from unknown module")
+            return
+
+        data = {'version': MANIFEST_VERSION,
+                'key': self._key(packages, excludes),
+                'mtimes': self._mtimes(modules),
+                'modules': list(modules),
+                'counts': counts,
+                'actions': resolved}
+
+        tmp = '%s.%s'%(self.filename, os.getpid())
+        try:
+            f = open(tmp, 'wb')
+            try:
+                cPickle.dump(data, f, cPickle.HIGHEST_PROTOCOL)
+            finally:
+                f.close()
+            os.rename(tmp, self.filename)
+        except Exception, e:
+            log.warning("Can't write actions manifest %s: %s",self.filename,e)
+
+    def _key(self, packages, excludes):
+        versions = dict((dist.project_name, dist.version)
+                        for dist in discovery.getIndex())
+        return (tuple(packages), tuple(excludes or ()), versions)
+
+    def _mtimes(self, modules):
+        mtimes = {}
+        for modname in modules:
+            module = sys.modules.get(modname)
+            if module is None: # pragma: no cover
+                continue
+
+            paths = list(getattr(module, '__path__', ()))
+
+            filename = getattr(module, '__file__', None)
+            if filename:
+                if filename[-4:] in ('.pyc', '.pyo') and \
+                        os.path.exists(filename[:-1]):
+                    filename = filename[:-1]
+                paths.append(filename)
+
+            for path in paths:
+                try:
+                    mtimes[path] = os.stat(path).st_mtime
+                except OSError: # pragma: no cover
+                    pass
+
+        return mtimes
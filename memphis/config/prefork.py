@@ -0,0 +1,104 @@
+""" preload configuration in parent process and fork workers """
+import os, gc, signal, logging
+
+import api
+from directives import event
+from watch import watchService
+from settings import initializeSettings
+
+log = logging.getLogger('memphis.config')
+
+_forkHandlers = []
+
+
+class ApplicationPreloaded(object):
+    """ Memphis sends this event in parent process when configuration
+    is loaded and before workers are forked. Subscribers should do
+    expensive work that workers can share, e.g. templates compilation. """
+    event('Application preloaded event')
+
+
+def forkHandler(handler):
+    """ Register handler that is called in worker process after fork """
+    _forkHandlers.append(handler)
+    return handler
+
+
+def preload(packages=None, excludes=(), settings=None, config=None, **kw):
+    """ Load configuration, settings and send
+    :py:class:`ApplicationPreloaded` event, then prepare heap for fork.
+    ``config`` is pyramid configurator, settings and templates are
+    watched only if it is set. Extra keyword arguments are passed
+    to ``initialize``. """
+    api.initialize(packages, excludes, **kw)
+    initializeSettings(dict(settings or {}), config)
+    api.notify(ApplicationPreloaded())
+
+    prepareFork()
+
+
+def prepareFork():
+    """ Collect garbage and stop collector, objects created by preload
+    are moved to permanent generation if ``gc.freeze`` is available,
+    so collector in workers doesn't touch shared pages """
+    gc.disable()
+    gc.collect()
+    if hasattr(gc, 'freeze'): # pragma: no cover
+        gc.freeze()
+
+
+def afterFork(threshold=None):
+    """ Initialize worker process. Without ``gc.freeze`` full collections
+    traverse inherited heap, ``threshold`` can be used to make them rare """
+    if threshold is not None:
+        gc.set_threshold(*threshold)
+    gc.enable()
+
+    for handler in _forkHandlers:
+        handler()
+
+
+def forkWorkers(count, worker, threshold=None):
+    """ Fork ``count`` worker processes running ``worker`` callable,
+    returns list of worker pids """
+    pids = []
+    for i in range(count):
+        pid = os.fork()
+        if pid == 0: # pragma: no cover
+            code = 0
+            try:
+                afterFork(threshold)
+                worker()
+            except:
+                log.exception("Worker process failed")
+                code = 1
+            os._exit(code)
+
+        pids.append(pid)
+
+    log.info("Forked %s workers: %s"%(count, pids))
+    return pids
+
+
+def serve(count, worker, threshold=None):
+    """ Fork workers and wait until all of them exit. Workers are
+    terminated if parent process is interrupted. """
+    pids = forkWorkers(count, worker, threshold)
+    try:
+        while pids:
+            pid, status = os.waitpid(-1, 0)
+            if pid in pids:
+                pids.remove(pid)
+    finally:
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError: # pragma: no cover
+                pass
+
+
+@forkHandler
+def restartWatchService():
+    # watch thread is shared by settings and templates watchers,
+    # it runs without settings file watcher too
+    watchService.restart()
@@ -0,0 +1,90 @@
+""" configuration startup profiler """
+import sys, time, json
+from zope.interface import providedBy
+
+
+class Profiler(object):
+    """ Records module import time during packages scan, actions execution
+    time and event subscribers time.
+
+    Profiler is passed to ``initialize`` and stays active until
+    ``ApplicationStarting`` event is sent, so subscribers of
+    ``SettingsInitializing`` and ``ApplicationStarting`` events are
+    recorded too. """
+
+    def __init__(self):
+        self.imports = []
+        self.actions = []
+        self.subscribers = []
+
+    def importModule(self, modname):
+        t = time.time()
+        __import__(modname)
+        self.imports.append((time.time() - t, modname))
+        return sys.modules[modname]
+
+    def execute(self, action):
+        t = time.time()
+        action()
+        info = action.info
+        if info is not None:
+            location = '%s:%s'%(info.filename, info.lineno)
+        else: # pragma: no cover
+            location = ''
+        self.actions.append(
+            (time.time() - t, repr(action.discriminator), location))
+
+    def notify(self, registry, event):
+        evname = _name(event[-1].__class__)
+        for handler in registry.adapters.subscriptions(
+                map(providedBy, event), None):
+            t = time.time()
+            handler(*event)
+            self.subscribers.append((time.time() - t, evname, _name(handler)))
+
+    def asdict(self, limit=None):
+        imports = sorted(self.imports, reverse=True)[:limit]
+        actions = sorted(self.actions, reverse=True)[:limit]
+        subscribers = sorted(self.subscribers, reverse=True)[:limit]
+
+        return {
+            'imports': [{'time': t, 'module': name} for t, name in imports],
+            'actions': [{'time': t, 'discriminator': d, 'location': loc}
+                        for t, d, loc in actions],
+            'subscribers': [{'time': t, 'event': ev, 'handler': name}
+                            for t, ev, name in subscribers],
+            'total': {
+                'imports': sum(r[0] for r in self.imports),
+                'actions': sum(r[0] for r in self.actions),
+                'subscribers': sum(r[0] for r in self.subscribers)},
+            }
+
+    def json(self, limit=None):
+        return json.dumps(self.asdict(limit), indent=2)
+
+    def report(self, limit=None):
+        data = self.asdict(limit)
+        total = data['total']
+
+        lines = ['Module imports (total %.4fs)'%total['imports']]
+        for rec in data['imports']:
+            lines.append('  %.4fs  %s'%(rec['time'], rec['module']))
+
+        lines.append('')
+        lines.append('Actions (total %.4fs)'%total['actions'])
+        for rec in data['actions']:
+            lines.append('  %.4fs  %s'%(rec['time'], rec['discriminator']))
+            lines.append('           %s'%rec['location'])
+
+        lines.append('')
+        lines.append('Event subscribers (total %.4fs)'%total['subscribers'])
+        for rec in data['subscribers']:
+            lines.append('  %.4fs  %s: %s'%(
+                    rec['time'], rec['event'], rec['handler']))
+
+        return '\n'.join(lines)
+
+
+def _name(ob):
+    return '%s.%s'%(getattr(ob, '__module__', ''),
+                    getattr(ob, '__name__', ob.__class__.__name__))
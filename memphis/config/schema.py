@@ -44,42 +44,20 @@ class Mapping(colander.Mapping):
 
     def flatten(self, node, appstruct, prefix='', listitem=False):
         result = {}
-        selfprefix = ''
-        if listitem:
-            selfprefix = prefix
-        elif node.name:
-            selfprefix = '%s%s.' % (prefix, node.name)
-
-        for subnode in node.children:
-            name = subnode.name
-            if name in appstruct:
-                substruct = appstruct[name]
-                result.update(subnode.typ.flatten(
-                        subnode, substruct, prefix=selfprefix))
+        _flatten(_indexMapping(node, _MAPPING),
+                 appstruct, prefix, listitem, result)
         return result
 
     def unflatten(self, node, paths, fstruct):
-        return _unflatten_mapping(node, paths, fstruct)
+        return _unflatten(_indexMapping(node, _MAPPING), paths, fstruct)
 
 
 class Sequence(colander.Sequence):
 
     def flatten(self, node, appstruct, prefix='', listitem=False):
         result = {}
-        selfprefix = ''
-        if listitem:
-            selfprefix = prefix
-        elif node.name:
-            selfprefix = '%s%s.' % (prefix, node.name)
-
-        childnode = node.children[0]
-
-        for num, subval in enumerate(appstruct):
-            subname = '%s%s' % (selfprefix, num)
-            subprefix = subname
-            result.update(childnode.typ.flatten(
-                    childnode, subval, prefix=subprefix, listitem=True))
-
+        _flatten((_SEQUENCE, node, _index(node.children[0])),
+                 appstruct, prefix, listitem, result)
         return result
 
 
@@ -130,61 +108,161 @@ class SchemaNode(colander.SchemaNode):
         return appstruct
 
 
-def _unflatten_mapping(node, paths, fstruct,
-                       get_child=None, rewrite_subpath=None):
-    if get_child is None:
-        get_child = node.__getitem__
-    if rewrite_subpath is None:
-        def rewrite_subpath(subpath):
-            return subpath
-    node_name = node.name
+class SchemaIndex(object):
+    """ Path index of schema nodes. Flatten and unflatten walk index once
+    and write values directly to result structure. Index has to be
+    rebuilt when schema changes. """
+
+    def __init__(self, node):
+        self.node = node
+        self.root = _index(node)
+
+    def flatten(self, appstruct):
+        result = {}
+        _flatten(self.root, appstruct, '', False, result)
+        return result
+
+    def unflatten(self, fstruct):
+        if self.root[0] not in (_MAPPING, _STRICT):
+            return self.node.unflatten(fstruct)
+        return _unflatten(self.root, fstruct.keys(), fstruct)
+
+
+# index entry kinds, memphis mapping ignores unknown paths
+_LEAF, _MAPPING, _STRICT, _SEQUENCE, _OTHER = range(5)
+
+_leafFlatten = colander.SchemaType.flatten.im_func
+_leafUnflatten = colander.SchemaType.unflatten.im_func
+
+
+def _index(node):
+    """ Index entry is (kind, node, children) """
+    tp = type(node.typ)
+    if tp is Mapping:
+        return _indexMapping(node, _MAPPING)
+    if tp is colander.Mapping:
+        return _indexMapping(node, _STRICT)
+    if tp is Sequence:
+        return (_SEQUENCE, node, _index(node.children[0]))
+
+    if not node.children and \
+            getattr(tp.flatten, 'im_func', None) is _leafFlatten and \
+            getattr(tp.unflatten, 'im_func', None) is _leafUnflatten:
+        return (_LEAF, node, None)
+    return (_OTHER, node, None)
+
+
+def _indexMapping(node, kind):
+    return (kind, node,
+            dict((child.name, _index(child)) for child in node.children))
+
+
+def _flatten(entry, appstruct, prefix, listitem, result):
+    # listitem prefix ends with dot, same as in colander
+    kind, node, children = entry
+
+    if kind == _LEAF:
+        if listitem:
+            result[prefix[:-1]] = appstruct
+        else:
+            result[prefix + node.name] = appstruct
+
+    elif kind == _MAPPING or kind == _STRICT:
+        if listitem:
+            selfprefix = prefix
+        elif node.name:
+            selfprefix = '%s%s.' % (prefix, node.name)
+        else:
+            selfprefix = prefix
+
+        for name, child in children.iteritems():
+            if name in appstruct:
+                _flatten(child, appstruct[name], selfprefix, False, result)
+            elif kind == _STRICT:
+                _flatten(child, colander.null, selfprefix, False, result)
+
+    elif kind == _SEQUENCE:
+        if listitem:
+            selfprefix = prefix
+        elif node.name:
+            selfprefix = '%s%s.' % (prefix, node.name)
+        else:
+            selfprefix = prefix
+
+        for num, subval in enumerate(appstruct):
+            _flatten(children, subval, '%s%s.' % (selfprefix, num),
+                     True, result)
+
+    else:
+        result.update(node.typ.flatten(node, appstruct, prefix, listitem))
+
+
+def _unflatten(root, paths, fstruct):
+    node_name = root[1].name
     if node_name:
         prefix = node_name + '.'
     else:
         prefix = ''
     prefix_len = len(prefix)
+
     appstruct = {}
-    subfstruct = {}
-    subpaths = []
-    curname = None
+    sequences = []
+    others = {}
+
     for path in paths:
-        if path == node_name or (prefix and not path.startswith(prefix)):
-            # flattened structs contain non-leaf nodes which are ignored
-            # during unflattening.
-            continue # pragma: no cover
-        assert path.startswith(prefix), "Bad node: %s" % path
-        subpath = path[prefix_len:]
-        if '.' in subpath:
-            name = subpath[:subpath.index('.')]
+        if prefix:
+            if path == node_name:
+                continue
+            if not path.startswith(prefix):
+                # memphis mapping ignores paths of other nodes
+                assert root[0] != _STRICT, "Bad node: %s" % path
+                continue
+            parts = path[prefix_len:].split('.')
         else:
-            name = subpath
-        if curname is None:
-            curname = name
-        elif name != curname:
-            try:
-                subnode = get_child(curname)
-            except:
-                subfstruct = {}
-                subpaths = []
-                curname = name
+            parts = path.split('.')
+
+        last = len(parts) - 1
+        container = appstruct
+        kind, node, children = root
+
+        for idx, name in enumerate(parts):
+            if kind == _SEQUENCE:
+                entry = children
             else:
-                appstruct[curname] = subnode.typ.unflatten(
-                    subnode, subpaths, subfstruct)
-                subfstruct = {}
-                subpaths = []
-                curname = name
-
-        subpath = rewrite_subpath(subpath)
-        subfstruct[subpath] = fstruct[path]
-        subpaths.append(subpath)
-
-    if curname is not None:
-        try:
-            subnode = get_child(curname)
-        except KeyError:
-            pass
-        else:
-            appstruct[curname] = subnode.typ.unflatten(
-                subnode, subpaths, subfstruct)
+                entry = children.get(name)
+                if entry is None:
+                    if kind == _STRICT:
+                        raise KeyError(name)
+                    break
+
+            kind, node, children = entry
+
+            if kind == _LEAF:
+                assert idx == last, "paths should be [name] for leaf nodes."
+                container[name] = fstruct[path]
+
+            elif kind == _OTHER:
+                # node type unflattens collected paths
+                key = (id(container), name)
+                item = others.get(key)
+                if item is None:
+                    item = others[key] = (container, name, node, {})
+                item[3]['.'.join([node.name] + parts[idx+1:])] = fstruct[path]
+                break
+
+            else:
+                substruct = container.get(name)
+                if substruct is None:
+                    substruct = container[name] = {}
+                    if kind == _SEQUENCE:
+                        sequences.append((container, name, substruct))
+                container = substruct
+
+    for container, name, node, fstruct in others.values():
+        container[name] = node.typ.unflatten(node, sorted(fstruct), fstruct)
+
+    # nested sequences are converted first
+    for container, name, items in reversed(sequences):
+        container[name] = [items[str(idx)] for idx in xrange(len(items))]
 
     return appstruct
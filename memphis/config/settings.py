@@ -1,6 +1,6 @@
 """ settings api """
 import colander
-import logging, os.path, ConfigParser
+import re, logging, os.path, threading, ConfigParser
 from datetime import datetime, timedelta
 from collections import OrderedDict
 from zope import interface
@@ -15,10 +15,14 @@ except ImportError:
     transaction = None
 
 import api, schema, shutdown
-from directives import event, DirectiveInfo, Action
+from compiled import CompiledSchema
+from watch import watchService
+from directives import event, subscriber, DirectiveInfo, Action
 
 log = logging.getLogger('memphis.config')
 
+_local = threading.local()
+
 
 class SettingsInitializing(object):
     """ Settings initializing event """
@@ -62,16 +66,38 @@ def initializeSettings(settings,
     Settings.config = config
     Settings.initialized = True
 
+    if 'watch_interval' in settings:
+        watchService.interval = float(settings['watch_interval'])
+
     if watcherFactory is _marker:
-        watcherFactory = iNotifyWatcher
+        watcher = settings.get('watcher')
+        if watcher == 'generation':
+            from memphis.config.generation import GenerationWatcher
+            watcherFactory = GenerationWatcher
+        elif watcher == 'poll':
+            watcherFactory = lambda handler: iNotifyWatcher(handler, True)
+        else:
+            watcherFactory = iNotifyWatcher
 
     here = settings.get('here', './')
     if loader is None:
-        loader = FileStorage(
+        factory = FileStorage
+        storage = settings.get('storage', '')
+        if storage == 'sqlite':
+            from memphis.config.dbstorage import SQLiteStorage as factory
+        elif storage == 'journal':
+            from memphis.config.journal import JournalStorage as factory
+
+        loader = factory(
             settings.get('settings',''),
             settings.get('defaults', ''),
             here, section, watcherFactory)
 
+    delay = float(settings.get('write_delay', 0) or 0)
+    if delay > 0:
+        from memphis.config.writer import BackgroundWriter
+        Settings.writer = BackgroundWriter(Settings._write, delay)
+
     include = settings.get('include', '')
     for f in include.split('\n'):
         f = f.strip()
@@ -95,6 +121,7 @@ def registerSettings(name, *nodes, **kw):
     title = kw.get('title', '')
     description = kw.get('description', '')
     validator = kw.get('validator', None)
+    compiled = kw.get('compiled', False)
 
     iname = name
     for ch in ('.', '-'):
@@ -110,6 +137,9 @@ def registerSettings(name, *nodes, **kw):
     else:
         group = Group(name, Settings, title, description, category)
 
+    if compiled:
+        group.compile()
+
     Settings.register(group)
 
     if validator is not None:
@@ -145,11 +175,45 @@ class SettingsImpl(dict):
 
     config = None
     loader = None
+    writer = None
     initialized = False
     _changed = None
+    _raw = None
+    _defaults = None
+    _compiled = None
+    _index = None
 
     def __init__(self):
         self.schema = schema.SchemaNode(schema.Mapping())
+        self._exported = {}
+
+    def defaults(self):
+        """ Flattened serialized defaults, computed once per schema
+        or defaults change """
+        defaults = self._defaults
+        if defaults is None:
+            defaults = self._defaults = \
+                self.index().flatten(self.schema.serialize())
+        return defaults
+
+    def index(self):
+        """ Schema path index, it is rebuilt on schema change """
+        index = self._index
+        if index is None:
+            index = self._index = schema.SchemaIndex(self.schema)
+        return index
+
+    def compiled(self):
+        """ Compiled schema, it is rebuilt on schema or defaults change """
+        compiled = self._compiled
+        if compiled is None:
+            compiled = self._compiled = CompiledSchema(self.schema)
+        return compiled
+
+    def _schemaChanged(self):
+        self._defaults = None
+        self._compiled = None
+        self._index = None
 
     def changed(self, group, attrs):
         if not self._changed:
@@ -164,13 +228,13 @@ class SettingsImpl(dict):
     def _load(self, rawdata, setdefaults=False, suppressevents=True):
         try:
             rawdata = dict((k.lower(), v) for k, v in rawdata.items())
-            data = self.schema.unflatten(rawdata)
+            data = self.index().unflatten(rawdata)
         except:
             log.error('Error loading settings')
             return
 
         try:
-            data = self.schema.deserialize(data)
+            data = self.compiled().deserialize(data)
         except colander.Invalid, e:
             errs = e.asdict()
             if setdefaults:
@@ -181,13 +245,13 @@ class SettingsImpl(dict):
             log.error('Error loading settings, reloading with defaults: \n%s'%(
                     '\n'.join('%s: %s'%(k, v) for k, v in errs.items())))
 
-            defaults = self.schema.flatten(self.schema.serialize())
+            defaults = self.defaults()
 
             for k in errs.keys():
                 rawdata.pop(k)
                 rawdata[k] = defaults[k]
 
-            data = self.schema.deserialize(self.schema.unflatten(rawdata))
+            data = self.compiled().deserialize(self.index().unflatten(rawdata))
 
         for name, group in self.items():
             if name in data and data[name]:
@@ -195,6 +259,7 @@ class SettingsImpl(dict):
                     for k, v in data[name].items():
                         if v is not colander.null:
                             group.schema[k].default = v
+                    self._schemaChanged()
 
                     group.update(data[name])
                 else:
@@ -218,53 +283,188 @@ class SettingsImpl(dict):
 
             group.update(data)
 
+        self._schemaChanged()
+
         if defaults:
             self._load(defaults, True)
 
         self.loader = loader
+        self._raw = None
         if loader is None:
             return
 
         self._load(loader.loadDefaults(), True)
-        self._load(loader.load())
+
+        rawdata = loader.load()
+        self._load(dict(rawdata))
+        self._raw = dict((k.lower(), v) for k, v in rawdata.items())
 
     def load(self):
         if self.loader is not None:
-            self._load(self.loader.load(), suppressevents=False)
+            rawdata = dict(
+                (k.lower(), v) for k, v in self.loader.load().items())
+
+            if self._raw is None:
+                self._load(dict(rawdata), suppressevents=False)
+            else:
+                self._reload(rawdata)
+
+            self._raw = rawdata
+
+    def _reload(self, rawdata):
+        """ Deserialize only nodes with changed raw values and notify
+        affected groups """
+        old = self._raw
+
+        changed = [k for k, v in rawdata.iteritems() if old.get(k, _marker)!=v]
+        changed.extend(k for k in old if k not in rawdata)
+
+        affected = {}
+        for key in changed:
+            parts = key.split('.', 2)
+            if len(parts) > 1 and parts[0] in self:
+                affected.setdefault(parts[0], set()).add(parts[1])
+
+        # not saved changes are overridden by loaded values
+        for name, attrs in (self._changed or {}).items():
+            affected.setdefault(name, set()).update(attrs)
+
+        if not affected:
+            return
+
+        # raw values of affected nodes
+        index = {}
+        for key, val in rawdata.iteritems():
+            parts = key.split('.', 2)
+            if len(parts) > 1 and parts[1] in affected.get(parts[0], ()):
+                index.setdefault((parts[0], parts[1]), {})[
+                    key[len(parts[0])+1:]] = val
+
+        # group validators need whole group, use generic path
+        for name in affected:
+            if self[name].schema.validator._validators:
+                self._load(dict(rawdata), suppressevents=False)
+                return
+
+        # all groups are deserialized before any of them is changed
+        updates = []
+        for name, nodes in affected.items():
+            group = self[name]
+
+            data = {}
+            for nodename in nodes:
+                try:
+                    node = group.schema[nodename]
+                except KeyError:
+                    continue
+
+                fstruct = index.get((name, nodename))
+                try:
+                    if fstruct is None:
+                        data[nodename] = node.deserialize(colander.null)
+                    else:
+                        data[nodename] = node.deserialize(node.typ.unflatten(
+                                node, sorted(fstruct), fstruct))
+                except colander.Invalid, e:
+                    log.error('Error loading settings, reloading '
+                              'with defaults: \n%s: %s'%(
+                            '%s.%s'%(name, nodename), e.asdict()))
+                    data[nodename] = node.default
+                except:
+                    log.error('Error loading settings')
+                    return
+
+            updates.append((group, data))
+
+        modified = []
+        for group, data in updates:
+            if any(group.get(k, _marker) != v for k, v in data.items()):
+                modified.append(group)
+            group.update(data)
+
+        for group in modified:
+            api.registry.subscribers(
+                (group, SettingsGroupModified(group, self.config)), None)
 
     def save(self, *args):
+        changed = []
         if self._changed is not None:
             for grp, attrs in self._changed.items():
+                changed.extend('%s.%s'%(grp, attr) for attr in attrs)
                 api.notify(SettingsGroupModified(self[grp], self.config))
 
             self._changed = None
 
-        if self.loader is not None:
-            data = self.export()
-            if data:
-                self.loader.save(data)
+        # events are sent in caller thread, writer only exports and saves
+        if self.writer is not None:
+            self.writer.schedule(changed)
+        else:
+            self._write(changed)
 
-    def export(self, default=False):
+    def _write(self, changed):
+        if self.loader is not None:
+            if getattr(self.loader, 'incremental', False):
+                # loader writes changed keys only
+                if changed:
+                    groups = set(name.split('.', 1)[0] for name in changed)
+                    self.loader.save(self.export(groups=groups), changed)
+            else:
+                data = self.export()
+                if data:
+                    self.loader.save(data)
+
+    def export(self, default=False, groups=None):
+        """ Flattened serialized settings, without default values if
+        ``default`` is False. Groups are serialized only if they have
+        been changed since previous export. """
         result = {}
         for name, group in self.items():
-            data = dict(group)
-            result[name] = data
+            if groups is not None and name not in groups:
+                continue
 
-        result = self.schema.serialize(result)
+            cache = self._exported.get(name)
+            if cache is None or default not in cache:
+                snapshot = group.snapshot
+                data = self._exportGroup(group, default)
+
+                # group can be changed by other thread during export
+                if group.snapshot is snapshot:
+                    self._exported.setdefault(name, {})[default] = data
+            else:
+                data = cache[default]
+
+            result.update(data)
+
+        return result
+
+    def _exportGroup(self, group, default):
+        schema = group.schema
+        result = schema.serialize(dict(group))
 
         if not default:
-            for prefix, group in self.items():
-                schema = group.schema
-                for key, val in group.items():
-                    if val == schema[key].default:
-                        del result[prefix][key]
+            for key, val in group.items():
+                if val == schema[key].default:
+                    del result[key]
 
-        return self.schema.flatten(result)
+        return schema.flatten(result)
 
     def register(self, group):
         if group.name not in self:
             self.schema.add(group.schema)
             self[group.name] = group
+            self._schemaChanged()
+
+    def snapshot(self):
+        """ Current snapshots of all groups """
+        return dict((name, group.snapshot) for name, group in self.items())
+
+    def pin(self):
+        """ Pin current snapshots for this thread, until :py:meth:`unpin`
+        call :py:meth:`Group.pinned` returns pinned group snapshot """
+        _local.snapshot = self.snapshot()
+
+    def unpin(self, *args):
+        _local.snapshot = None
 
 
 class GroupValidator(object):
@@ -294,8 +494,73 @@ class GroupValidator(object):
             raise error
 
 
+class GroupSnapshot(object):
+    """ Immutable settings group values, values are attributes """
+
+    def __init__(self, values):
+        self.__dict__.update(values)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Settings snapshot is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Settings snapshot is immutable")
+
+    def __getitem__(self, name):
+        return self.__dict__[name]
+
+    def __contains__(self, name):
+        return name in self.__dict__
+
+    def __iter__(self):
+        return iter(self.__dict__)
+
+    def __len__(self):
+        return len(self.__dict__)
+
+
+class CompiledSnapshot(object):
+    """ Immutable settings group values stored in slots, subclass with
+    slot for each setting and accessor is generated for group """
+
+    __slots__ = ()
+
+    def __init__(self, values):
+        set = object.__setattr__
+        for name in self.__slots__:
+            if name in values:
+                set(self, name, values[name])
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Settings snapshot is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Settings snapshot is immutable")
+
+    def __getitem__(self, name):
+        try:
+            return getattr(self, name)
+        except AttributeError:
+            raise KeyError(name)
+
+    def __contains__(self, name):
+        return name in self.__slots__ and hasattr(self, name)
+
+    def __iter__(self):
+        return (name for name in self.__slots__ if hasattr(self, name))
+
+    def __len__(self):
+        return len(list(iter(self)))
+
+
+_identifier = re.compile('^[a-zA-Z_][a-zA-Z0-9_]*$')
+
+
 class Group(dict):
 
+    compiled = False
+    _snapshotClass = None
+
     def __init__(self, name, settings, title, description, category):
         self.name = name
         self.title = title
@@ -307,13 +572,95 @@ class Group(dict):
             name=name,
             required=False,
             validator=GroupValidator())
+        self.accessors = OrderedDict()
+        self.snapshot = GroupSnapshot({})
 
         interface.directlyProvides(self, category)
 
+    def compile(self):
+        """ Use generated slot based class for group snapshot """
+        self.compiled = True
+        self._snapshotClass = None
+        self._rebuild()
+
+    def addAccessor(self, name, func):
+        """ Add precomputed value to group snapshot, ``func`` is called
+        with group values on every change """
+        self.accessors[name] = func
+        self._snapshotClass = None
+        self._rebuild()
+
+    def _buildClass(self):
+        names = [node.name for node in self.schema.children]
+        names.extend(self.accessors)
+        for name in names:
+            if not _identifier.match(name):
+                log.warning("Settings group '%s' can't be compiled, "
+                            "'%s' is not identifier", self.name, name)
+                return GroupSnapshot
+
+        return type('CompiledSnapshot:%s'%self.name,
+                    (CompiledSnapshot,), {'__slots__': tuple(names)})
+
+    def _rebuild(self):
+        self.settings._exported.pop(self.name, None)
+
+        # new snapshot is built and swapped, old one stays unchanged
+        values = self
+        if self.accessors:
+            values = dict(self)
+            for name, func in self.accessors.items():
+                try:
+                    values[name] = func(values)
+                except (KeyError, AttributeError):
+                    # group is not populated yet
+                    pass
+                except Exception:
+                    log.exception("Settings group '%s' accessor '%s' "
+                                  "failed", self.name, name)
+
+        if self.compiled:
+            if self._snapshotClass is None:
+                self._snapshotClass = self._buildClass()
+            self.snapshot = self._snapshotClass(values)
+        else:
+            self.snapshot = GroupSnapshot(values)
+
+    def pinned(self):
+        """ Snapshot pinned by :py:meth:`SettingsImpl.pin` for current
+        thread or current snapshot """
+        snapshot = getattr(_local, 'snapshot', None)
+        if snapshot is not None:
+            try:
+                return snapshot[self.name]
+            except KeyError:
+                pass
+        return self.snapshot
+
     def register(self, node):
         if node not in self.schema.children:
             super(Group, self).__setitem__(node.name, node.default)
             self.schema.add(node)
+            self.settings._schemaChanged()
+            self._snapshotClass = None
+            self._rebuild()
+
+    def update(self, *args, **kw):
+        super(Group, self).update(*args, **kw)
+        self._rebuild()
+
+    def clear(self):
+        super(Group, self).clear()
+        self._rebuild()
+
+    def __delitem__(self, attr):
+        super(Group, self).__delitem__(attr)
+        self._rebuild()
+
+    def pop(self, *args):
+        value = super(Group, self).pop(*args)
+        self._rebuild()
+        return value
 
     def __getattr__(self, attr, default=_marker):
         res = self.get(attr, default)
@@ -325,6 +672,7 @@ class Group(dict):
         if attr in self.schema and value != self[attr]:
             self.settings.changed(self.name, (attr,))
         super(Group, self).__setitem__(attr, value)
+        self._rebuild()
 
 
 class FileStorage(object):
@@ -346,6 +694,13 @@ class FileStorage(object):
         if self.watcher is not None:
             self.watcher.start(fn)
 
+    def _saved(self):
+        self._startWatcher(self.cfg)
+
+        saved = getattr(self.watcher, 'saved', None)
+        if saved is not None:
+            saved()
+
     def close(self):
         if self.watcher is not None:
             self.watcher.stop()
@@ -422,61 +777,48 @@ class FileStorage(object):
         finally:
             fp.close()
 
-        self._startWatcher(self.cfg)
+        self._saved()
 
 
 Settings = SettingsImpl()
 
 
-try:
-    import pyinotify
-except ImportError: # pragma: no cover
-    pyinotify = None
-
-
 class iNotifyWatcher(object):
-
-    if pyinotify:
-        mask = pyinotify.IN_MODIFY
+    """ Settings file watcher, file is watched by process wide
+    watch service with inotify or with poller """
 
     started = False
     filename = ''
 
-    def __init__(self, handler):
+    def __init__(self, handler, poll=False):
         self._handler = handler
+        self._watch = None
+        self.poll = poll
 
-    def _process_ev(self, ev):
-        if ev.mask & pyinotify.IN_MODIFY:
-            if Settings.config is not None:
-                Settings.config.begin()
-
-            self._handler()
+    def _process_ev(self, path, isdir):
+        if Settings.config is not None:
+            Settings.config.begin()
 
-            if Settings.config is not None:
-                Settings.config.end()
+        self._handler()
 
-    def start(self, filename): # pragma: no cover
-        pass
+        if Settings.config is not None:
+            Settings.config.end()
 
-    if pyinotify:
+    def start(self, filename):
+        if Settings.config is None:
+            return
 
-        def start(self, filename):
-            if Settings.config is None:
+        if self.started:
+            if self.filename != filename: # pragma: no cover
+                self.stop()
+            else:
                 return
 
-            if self.started:
-                if self.filename != filename: # pragma: no cover
-                    self.stop()
-                else:
-                    return
+        self._watch = watchService.watch(
+            filename, self._process_ev, poll=self.poll)
 
-            wm = pyinotify.WatchManager()
-            wm.add_watch(filename, self.mask, self._process_ev, False, False)
-            self.notifier = notifier = pyinotify.ThreadedNotifier(wm)
-            self.notifier.start()
-
-            self.started = True
-            self.filename = filename
+        self.started = True
+        self.filename = filename
 
     def stop(self):
         if Settings.config is None:
@@ -486,18 +828,37 @@ class iNotifyWatcher(object):
             self.filename = ''
             self.started = False
 
-            self.notifier.stop()
-            del self.notifier
+            watchService.unwatch(self._watch)
+            self._watch = None
+
+
+@subscriber(api.ApplicationStarting)
+def startRequestPin(ev):
+    if hasattr(ev.config, 'add_subscriber'):
+        ev.config.add_subscriber(pinRequest, 'pyramid.events.NewRequest')
+
+
+def pinRequest(ev):
+    """ Pin settings snapshot for request lifetime """
+    Settings.pin()
+    ev.request.add_finished_callback(Settings.unpin)
 
 
 @shutdown.shutdownHandler
 def shutdown():
+    if Settings.writer is not None:
+        Settings.writer.flush()
+
     if Settings.loader is not None:
         Settings.loader.close()
 
 
 @api.addCleanup
 def cleanup():
+    if Settings.writer is not None:
+        Settings.writer.cancel()
+        Settings.writer = None
+
     if Settings.loader is not None:
         Settings.loader.close()
         Settings.loader = None
@@ -508,6 +869,9 @@ def cleanup():
             group.update({node.name: node.default})
 
     Settings.clear()
+    Settings.unpin()
+    Settings._exported.clear()
+    Settings._schemaChanged()
     Settings.schema.children[:] = []
     Settings.config = None
     Settings.initialized = False
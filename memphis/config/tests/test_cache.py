@@ -0,0 +1,182 @@
+""" registry lookup cache tests """
+import unittest
+from zope import interface
+from zope.interface.registry import Components
+
+from memphis import config
+from memphis.config.cache import LookupCache
+
+
+class IContext(interface.Interface):
+    pass
+
+class IAdapter(interface.Interface):
+    pass
+
+
+class Context(object):
+    interface.implements(IContext)
+
+
+class Adapter(object):
+
+    def __init__(self, context):
+        self.context = context
+
+
+class TestAdapterHook(unittest.TestCase):
+
+    def setUp(self):
+        config.initialize(('memphis.config',), reg=Components('test'))
+
+    def tearDown(self):
+        config.cleanUp()
+
+    def test_adapter_hook(self):
+        config.registry.registerAdapter(Adapter, (IContext,), IAdapter)
+
+        ctx = Context()
+        adapter = IAdapter(ctx)
+        self.assertTrue(isinstance(adapter, Adapter))
+        self.assertIs(adapter.context, ctx)
+
+        self.assertIsNone(IAdapter(object(), None))
+
+    def test_adapter_hook_default(self):
+        config.registry.registerAdapter(
+            lambda ctx: None, (IContext,), IAdapter)
+
+        self.assertIsNone(IAdapter(Context(), None))
+        self.assertRaises(TypeError, IAdapter, object())
+
+    def test_adapter_hook_registry_changes(self):
+        ctx = Context()
+        self.assertIsNone(IAdapter(ctx, None))
+
+        config.registry.registerAdapter(Adapter, (IContext,), IAdapter)
+        self.assertTrue(isinstance(IAdapter(ctx), Adapter))
+
+        # new registry
+        config.initialize(('memphis.config',), reg=Components('test'))
+        self.assertIsNone(IAdapter(ctx, None))
+
+    def test_adapter_hook_frozen(self):
+        config.registry.registerAdapter(Adapter, (IContext,), IAdapter)
+        config.freeze()
+
+        self.assertTrue(isinstance(IAdapter(Context()), Adapter))
+
+
+class TestLookupCache(unittest.TestCase):
+
+    def test_cache(self):
+        reg = Components('test')
+        cache = LookupCache()
+        ctx = interface.providedBy(Context())
+
+        self.assertIsNone(cache.lookup(reg, (ctx,), IAdapter))
+        self.assertIsNone(cache.lookup(reg, (ctx,), IAdapter))
+        self.assertEqual(cache.stats(), {'hits':1, 'misses':1, 'size':1})
+
+        # registry change drops cache
+        reg.registerAdapter(Adapter, (IContext,), IAdapter)
+        self.assertEqual(cache.stats()['size'], 0)
+        self.assertIs(cache.lookup(reg, (ctx,), IAdapter), Adapter)
+
+        # other registry
+        reg2 = Components('test')
+        self.assertIsNone(cache.lookup(reg2, (ctx,), IAdapter))
+        self.assertEqual(cache.misses, 3)
+
+        # replaced registry is not watched
+        reg.registerAdapter(Adapter, (IContext,), IAdapter, 'name')
+        self.assertEqual(cache.stats()['size'], 1)
+
+    def test_cache_base_registry(self):
+        base = Components('base')
+        reg = Components('test', bases=(base,))
+        cache = LookupCache()
+        ctx = interface.providedBy(Context())
+
+        self.assertIsNone(cache.lookup(reg, (ctx,), IAdapter))
+
+        base.registerAdapter(Adapter, (IContext,), IAdapter)
+        self.assertEqual(cache.stats()['size'], 0)
+        self.assertIs(cache.lookup(reg, (ctx,), IAdapter), Adapter)
+
+    def test_cache_bounded(self):
+        reg = Components('test')
+        cache = LookupCache(2)
+
+        for i in range(5):
+            cache.lookup(reg, (interface.providedBy(i),), IAdapter, str(i))
+            self.assertTrue(len(cache.data) <= 2)
+
+        self.assertEqual(cache.misses, 5)
+
+        cache.clear()
+        self.assertEqual(cache.stats(), {'hits':0, 'misses':0, 'size':0})
+
+
+class IEvent(interface.Interface):
+    pass
+
+
+class Event(object):
+    interface.implements(IEvent)
+
+
+class TestDispatchTable(unittest.TestCase):
+
+    def setUp(self):
+        config.initialize(('memphis.config',), reg=Components('test'))
+
+    def tearDown(self):
+        config.cleanUp()
+
+    def test_notify(self):
+        events = []
+        table = config.dispatchTable
+
+        config.notify(Event())
+        self.assertEqual(table.stats(), {'hits':0, 'misses':1, 'size':1})
+        self.assertEqual(table.data.values(), [()])
+
+        config.registry.registerHandler(events.append, (IEvent,))
+
+        ev = Event()
+        config.notify(ev)
+        config.notify(ev)
+        self.assertEqual(events, [ev, ev])
+        self.assertEqual(table.stats(), {'hits':1, 'misses':2, 'size':1})
+
+    def test_registry_replaced(self):
+        events = []
+        config.registry.registerHandler(events.append, (IEvent,))
+
+        config.notify(Event())
+        self.assertEqual(len(events), 1)
+
+        config.initialize(('memphis.config',), reg=Components('test'))
+        self.assertIs(config.dispatchTable.registry, config.registry)
+        self.assertEqual(config.dispatchTable.stats()['size'], 0)
+
+        config.notify(Event())
+        self.assertEqual(len(events), 1)
+
+    def test_object_event(self):
+        from zope.interface.interfaces import ObjectEvent, IObjectEvent
+
+        events = []
+        config.registry.registerHandler(
+            config.api.objectEventNotify, (IObjectEvent,))
+        config.registry.registerHandler(
+            lambda ob, ev: events.append((ob, ev)), (IContext, IObjectEvent))
+
+        ctx = Context()
+        ev = ObjectEvent(ctx)
+        config.notify(ev)
+        config.notify(ev)
+
+        self.assertEqual(events, [(ctx, ev), (ctx, ev)])
+        self.assertEqual(config.dispatchTable.misses, 2)
@@ -81,3 +81,30 @@ class TestCommand(BaseTesting):
         val = out.getvalue().strip()
         self.assertIn('group1.node = test', val)
         self.assertIn('group2.node = test', val)
+
+    def test_settings_command_profile(self):
+        sys.argv[1:] = ['--profile']
+
+        stdout = sys.stdout
+        out = StringIO()
+        sys.stdout = out
+
+        commands.settingsCommand()
+        sys.stdout = stdout
+
+        val = out.getvalue()
+        self.assertIn('Module imports', val)
+        self.assertIn('Event subscribers', val)
+
+    def test_settings_command_profile_json(self):
+        sys.argv[1:] = ['--profile-json']
+
+        stdout = sys.stdout
+        out = StringIO()
+        sys.stdout = out
+
+        commands.settingsCommand()
+        sys.stdout = stdout
+
+        val = out.getvalue()
+        self.assertIn('"subscribers"', val)
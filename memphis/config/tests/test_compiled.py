@@ -0,0 +1,155 @@
+""" compiled settings schema tests """
+import unittest, colander
+from zope.interface.registry import Components
+
+from memphis import config
+from memphis.config.schema import SchemaNode, Mapping
+from memphis.config.compiled import CompiledSchema
+
+
+class TestCompiledSchema(unittest.TestCase):
+
+    def tearDown(self):
+        config.cleanUp(self.__class__.__module__)
+
+    def _schema(self, *groups):
+        node = SchemaNode(Mapping())
+        for group in groups:
+            node.add(group)
+        return node
+
+    def _group(self, name, *nodes, **kw):
+        group = SchemaNode(Mapping(), name=name, required=False, **kw)
+        for node in nodes:
+            group.add(node)
+        return group
+
+    def _compare(self, schema, cstruct):
+        # compiled path without generic fallback
+        compiled = CompiledSchema(schema)
+        self.assertEqual(compiled._deserialize(cstruct),
+                         schema.deserialize(cstruct))
+        return compiled.deserialize(cstruct)
+
+    def _errors(self, schema, cstruct):
+        try:
+            schema.deserialize(cstruct)
+        except colander.Invalid, e:
+            expected = e.asdict()
+
+        try:
+            CompiledSchema(schema).deserialize(cstruct)
+        except colander.Invalid, e:
+            self.assertEqual(e.asdict(), expected)
+            return expected
+
+        self.fail('Invalid is not raised') # pragma: no cover
+
+    def test_deserialize(self):
+        schema = self._schema(
+            self._group(
+                'group1',
+                SchemaNode(colander.Str(), name='node1', default='d1'),
+                SchemaNode(colander.Int(), name='node2', default=10),
+                SchemaNode(colander.Bool(), name='node3', default=False,
+                           preparer=lambda v: not v)),
+            self._group(
+                'group2',
+                SchemaNode(colander.Str(), name='node1', default='d2')))
+
+        compiled = CompiledSchema(schema)
+        self.assertTrue(compiled.groups[0][2] is not None)
+
+        self.assertEqual(
+            self._compare(schema, {'group1': {'node2': '20', 'unknown': '1'}}),
+            {'group1': {'node1': 'd1', 'node2': 20, 'node3': True},
+             'group2': colander.null})
+
+        self._compare(schema, {'group1': {}, 'group2': {'node1': 'v'}})
+        self._compare(schema, {'group1': {'node1': '', 'node2': 0,
+                                          'node3': 'FALSE'}})
+        self._compare(schema, {'group1': {'node1': u'\u0444', 'node2': '',
+                                          'node3': '0'}})
+        self._compare(schema, {'group1': {'node1': '\xd1\x84',
+                                          'node3': 'on'}})
+
+    def test_not_compiled(self):
+        sub = SchemaNode(Mapping(), name='sub')
+        sub.add(SchemaNode(colander.Str(), name='node', default='d'))
+
+        schema = self._schema(
+            self._group('group1', sub),
+            self._group('group2', SchemaNode(colander.Str(), name='node1'),
+                        preparer=lambda v: v),
+            self._group('group3'))
+        schema['group3'].typ.unknown = 'preserve'
+
+        compiled = CompiledSchema(schema)
+        self.assertEqual(compiled.groups[0][2][0][1], sub.deserialize)
+        self.assertTrue(compiled.groups[1][2] is None)
+        self.assertTrue(compiled.groups[2][2] is None)
+
+        self._compare(schema, {'group1': {'sub': {'node': 'v'}},
+                               'group2': {'node1': 'v'},
+                               'group3': {'key': 'v'}})
+
+    def test_errors(self):
+        def validator(node, appstruct):
+            if appstruct == 'invalid':
+                raise colander.Invalid(node, 'Invalid value')
+
+        schema = self._schema(
+            self._group(
+                'group1',
+                SchemaNode(colander.Int(), name='node1', default=10),
+                SchemaNode(colander.Str(), name='node2',
+                           default='d', validator=validator),
+                SchemaNode(colander.Str(), name='node3')))
+
+        errors = self._errors(
+            schema, {'group1': {'node1': 'abc', 'node2': 'invalid'}})
+        self.assertEqual(
+            sorted(errors), ['group1.node1', 'group1.node2', 'group1.node3'])
+
+        # not a mapping
+        self._errors(schema, {'group1': 'abc'})
+
+    def test_group_validator(self):
+        def validator(node, appstruct):
+            if appstruct and appstruct['node1'] == appstruct['node2']:
+                raise colander.Invalid(node['node2'], 'Same values')
+
+        node1 = config.SchemaNode(colander.Str(), name='node1', default='1')
+        node2 = config.SchemaNode(colander.Str(), name='node2', default='2')
+        group = config.registerSettings(
+            'group', node1, node2, validator=validator)
+        config.initialize(('memphis.config', self.__class__.__module__),
+                          reg=Components('test'))
+
+        schema = config.Settings.schema
+        self._compare(schema, {'group': {'node1': 'v'}})
+        self.assertEqual(
+            self._errors(schema, {'group': {'node1': 'v', 'node2': 'v'}}),
+            {'group.node2': 'Same values'})
+
+    def test_settings_compiled(self):
+        node1 = config.SchemaNode(colander.Str(), name='node1', default='1')
+        group = config.registerSettings('group', node1)
+        config.initialize(('memphis.config', self.__class__.__module__),
+                          reg=Components('test'))
+
+        compiled = config.Settings.compiled()
+        self.assertTrue(config.Settings.compiled() is compiled)
+
+        # defaults are changed
+        config.Settings._load({'group.node1': 'new'}, setdefaults=True)
+        self.assertFalse(config.Settings.compiled() is compiled)
+        self.assertEqual(node1.default, 'new')
+        self.assertEqual(config.Settings.compiled().deserialize(
+                {'group': {}}), {'group': {'node1': 'new'}})
+
+        # new node
+        compiled = config.Settings.compiled()
+        group.register(
+            config.SchemaNode(colander.Str(), name='node2', default='2'))
+        self.assertFalse(config.Settings.compiled() is compiled)
@@ -0,0 +1,100 @@
+""" sqlite settings storage tests """
+import os, shutil, tempfile, unittest, colander
+from zope.interface.registry import Components
+
+from memphis import config
+from memphis.config.dbstorage import SQLiteStorage
+
+
+class TestSQLiteStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'settings.db')
+
+    def tearDown(self):
+        config.cleanUp(self.__class__.__module__)
+        shutil.rmtree(self.dir)
+
+    def test_no_file(self):
+        storage = SQLiteStorage(None)
+        self.assertEqual(storage.load(), {})
+        self.assertEqual(storage.save({'group.node': '1'}), None)
+        self.assertEqual(storage.version(), 0)
+
+    def test_save_load(self):
+        storage = SQLiteStorage(self.path)
+        self.assertEqual(storage.load(), {})
+        self.assertEqual(storage.version(), 0)
+
+        storage.save({'group.node1': 'value', 'group.node2': '10'})
+        self.assertEqual(storage.load(),
+                         {'group.node1': 'value', 'group.node2': '10'})
+        self.assertEqual(storage.version(), 1)
+
+        # full save replaces all keys
+        storage.save({'group.node1': 'value'})
+        self.assertEqual(storage.load(), {'group.node1': 'value'})
+        self.assertEqual(storage.version(), 2)
+
+    def test_save_changed(self):
+        storage = SQLiteStorage(self.path)
+        storage.save({'group.node1': 'value', 'group.node2': '10',
+                      'group.node3.0': 'a', 'group.node3.1': 'b',
+                      'group.node33': 'c'})
+
+        storage.save({'group.node1': 'new', 'group.node2': '20',
+                      'group.node3.0': 'x'}, ['group.node1', 'group.node3'])
+
+        self.assertEqual(storage.load(),
+                         {'group.node1': 'new', 'group.node2': '10',
+                          'group.node3.0': 'x', 'group.node33': 'c'})
+
+        # changed key without value is removed
+        storage.save({}, ['group.node2'])
+        self.assertEqual(storage.load(),
+                         {'group.node1': 'new',
+                          'group.node3.0': 'x', 'group.node33': 'c'})
+        self.assertEqual(storage.version(), 3)
+
+    def test_sections(self):
+        storage1 = SQLiteStorage(self.path, section='app1')
+        storage2 = SQLiteStorage(self.path, section='app2')
+
+        storage1.save({'group.node': '1'})
+        self.assertEqual(storage1.load(), {'group.node': '1'})
+        self.assertEqual(storage2.load(), {})
+        self.assertEqual(storage1.version(), 1)
+        self.assertEqual(storage2.version(), 0)
+
+    def test_settings_save(self):
+        node1 = config.SchemaNode(colander.Str(), name='node1', default='d1')
+        node2 = config.SchemaNode(colander.Int(), name='node2', default=10)
+        group = config.registerSettings('group', node1, node2)
+
+        config.initialize(('memphis.config', self.__class__.__module__),
+                          reg=Components('test'))
+        config.initializeSettings(
+            {'settings': self.path, 'storage': 'sqlite'}, watcherFactory=None)
+
+        storage = config.Settings.loader
+        self.assertTrue(isinstance(storage, SQLiteStorage))
+
+        # nothing changed
+        config.Settings.save()
+        self.assertEqual(storage.version(), 0)
+
+        group['node1'] = 'value'
+        config.Settings.save()
+        self.assertEqual(storage.load(), {'group.node1': 'value'})
+
+        group['node2'] = 20
+        config.Settings.save()
+        self.assertEqual(storage.load(),
+                         {'group.node1': 'value', 'group.node2': '20'})
+
+        # default value is removed
+        group['node1'] = 'd1'
+        config.Settings.save()
+        self.assertEqual(storage.load(), {'group.node2': '20'})
+        self.assertEqual(storage.version(), 3)
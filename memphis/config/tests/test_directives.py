@@ -375,6 +375,41 @@ class TestExtraDirective(BaseTesting):
         actions = directives.scan(self.__class__.__module__, seen)
         self.assertTrue(len(actions) == 0)
 
+    def test_scan_prefetch(self):
+        import os, subprocess
+        import memphis.config
+
+        # each scan runs in fresh interpreter, modules are not imported yet
+        script = (
+            "import sys\n"
+            "from memphis.config import directives\n"
+            "modules = []\n"
+            "actions = directives.scan("
+            "'memphis.view', set(), None, modules, int(sys.argv[1]))\n"
+            "for modname in modules:\n"
+            "    print 'module', modname\n"
+            "for action in actions:\n"
+            "    print 'action', action.discriminator[0], "
+            "action.info.filename, action.info.lineno\n")
+
+        def scan(prefetch):
+            proc = subprocess.Popen(
+                [sys.executable, '-c', script, str(prefetch)],
+                stdout=subprocess.PIPE)
+            output = proc.communicate()[0]
+            self.assertEqual(proc.returncode, 0)
+            return output.splitlines()
+
+        output = scan(0)
+        self.assertIn('module memphis.view.layout', output)
+        self.assertTrue([l for l in output if l.startswith('action ')])
+        self.assertEqual(scan(4), output)
+
+        files = directives.prefetchFiles(memphis.config.__path__, 2)
+        self.assertIn(os.path.join(memphis.config.__path__[0], 'api.py'),
+                      files)
+        self.assertEqual(directives.prefetchFiles([], 2), [])
+
     def test_directive_info_limit_scope(self):
         self.assertRaises(
             TypeError,
@@ -389,6 +424,16 @@ class TestExtraDirective(BaseTesting):
         self.assertEqual(info.context,
                          sys.modules[self.__class__.__module__])
 
+    def test_directive_info_codeinfo(self):
+        info = directives.DirectiveInfo(0)
+
+        self.assertEqual(info.filename, __file__.replace('.pyc', '.py'))
+        self.assertEqual(info.function, 'test_directive_info_codeinfo')
+        self.assertEqual(
+            info.codeinfo,
+            (info.filename, info.lineno, info.function,
+             'info = directives.DirectiveInfo(0)'))
+
     def test_api_init(self):
         global testHandler
 
@@ -406,6 +451,100 @@ class TestExtraDirective(BaseTesting):
 
         self.assertTrue(len(processed) == 1)
 
+    def _makeAction(self, discriminator, order=0):
+        action = directives.Action(None, discriminator=discriminator,
+                                   order=order)
+        action.info = directives.DirectiveInfo(0)
+        return action
+
+    def test_resolve_conflicts_discriminator_once(self):
+        calls = []
+        def discriminator(action):
+            calls.append(action)
+            return ('test', len(calls))
+
+        action = self._makeAction(discriminator)
+        self.assertEqual(action.discriminator, ('test', 1))
+        self.assertEqual(directives.resolveConflicts([action]), [action])
+        self.assertEqual(len(calls), 1)
+
+    def test_resolve_conflicts_order(self):
+        a1 = self._makeAction(('test', 1))
+        a2 = self._makeAction(('test', 2))
+        a3 = self._makeAction(('test', 3), order=1)
+        a4 = self._makeAction(('test', 4))
+
+        self.assertEqual(
+            directives.resolveConflicts([a1, a2, a3, a4]), [a1, a2, a3, a4])
+
+        a1.order = 10
+        self.assertEqual(
+            directives.resolveConflicts([a1, a2, a3, a4]), [a2, a3, a4, a1])
+
+    def test_resolve_conflicts_index(self):
+        a1 = self._makeAction(('test', 1))
+        a2 = self._makeAction(('test', 2))
+        a3 = self._makeAction(('test', 1))
+
+        index = directives.DiscriminatorIndex()
+        directives.resolveConflicts([a1], index)
+        self.assertIs(index[('test', 1)], a1)
+
+        directives.resolveConflicts([a2], index)
+        self.assertIs(index[('test', 2)], a2)
+
+        try:
+            directives.resolveConflicts([a3], index)
+        except config.ConflictError, e:
+            self.assertEqual(
+                e._conflicts, {('test', 1): [a1.info, a3.info]})
+        else: # pragma: no cover
+            self.fail('ConflictError is not raised')
+
+        self.assertNotIn(a3, index.values())
+
+    def test_api_include(self):
+        global testHandler
+
+        processed = []
+
+        @config.action
+        def testHandler(*args):
+            processed.append(1)
+
+        config.initialize(('memphis.config',))
+        self.assertTrue(len(processed) == 0)
+
+        config.include((self.__class__.__module__,))
+        self.assertTrue(len(processed) == 1)
+
+        # already included
+        config.include((self.__class__.__module__,))
+        self.assertTrue(len(processed) == 1)
+
+    def test_api_include_conflict(self):
+        global testHandler
+        from memphis.config import api
+
+        @config.action
+        def testHandler(*args): # pragma: no cover
+            pass
+
+        config.initialize(('memphis.config',))
+
+        api._executed[None] = directives.Action(
+            None, info=directives.DirectiveInfo(0))
+
+        self.assertRaises(
+            config.ConflictError,
+            config.include, (self.__class__.__module__,))
+
+    def test_api_include_not_initialized(self):
+        config.cleanUp()
+
+        self.assertRaises(
+            RuntimeError, config.include, (self.__class__.__module__,))
+
     def test_api_loadpackage(self):
         from memphis.config import api
 
@@ -0,0 +1,106 @@
+""" packages discovery tests """
+import os, sys, shutil, zipfile, tempfile, unittest
+
+from memphis.config import api, discovery
+
+
+class TestDiscovery(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def _write(self, path, data):
+        path = os.path.join(self.dir, path)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        f = open(path, 'wb')
+        f.write(data)
+        f.close()
+
+    def _create_dists(self):
+        self._write('test.app-1.0-py2.7.egg-info/requires.txt',
+                    'test_plugin>=1.0\nmissing\n\n[test]\nnose\n')
+        self._write('test.app-1.0-py2.7.egg-info/entry_points.txt',
+                    '[memphis]\npackage = test.app\n')
+        self._write('test_plugin-2.0.dist-info/METADATA',
+                    'Name: test-plugin\nVersion: 2.0\n'
+                    'Requires-Dist: test.lib (>=1.0)\n'
+                    'Requires-Dist: nose; extra == "test"\n')
+        self._write('test_plugin-2.0.dist-info/entry_points.txt',
+                    '[memphis]\npackage = test.plugin:main\n')
+        self._write('develop/test.lib.egg-info/PKG-INFO',
+                    'Name: test.lib\nVersion: 0.1\n')
+        self._write('test.lib.egg-link', '%s\n.'%
+                    os.path.join(self.dir, 'develop'))
+
+        zf = zipfile.ZipFile(os.path.join(self.dir, 'zipped-3.0.egg'), 'w')
+        zf.writestr('EGG-INFO/entry_points.txt', '[other]\na = b\n')
+        zf.close()
+
+    def test_discovery_index(self):
+        self._create_dists()
+
+        index = discovery.DistributionIndex([self.dir])
+        self.assertEqual(
+            [dist.project_name for dist in index],
+            ['test.app', 'test.lib', 'test-plugin', 'zipped'])
+
+        dist = index.get('test.app')
+        self.assertEqual(dist.version, '1.0')
+        self.assertEqual(dist.requires(), ['test-plugin', 'missing'])
+        self.assertEqual(dist.get_entry_map('memphis'),
+                         {'package': 'test.app'})
+        self.assertEqual(dist.get_entry_map('unknown'), {})
+
+        dist = index.get('Test_Plugin')
+        self.assertEqual(dist.version, '2.0')
+        self.assertEqual(dist.requires(), ['test.lib'])
+        self.assertEqual(dist.get_entry_map('memphis'),
+                         {'package': 'test.plugin'})
+
+        dist = index.get('test.lib')
+        self.assertEqual(dist.version, '0.1')
+        self.assertEqual(dist.requires(), [])
+        self.assertEqual(dist.get_entry_map('memphis'), {})
+
+        dist = index.get('zipped')
+        self.assertEqual(dist.version, '3.0')
+        self.assertEqual(dist.get_entry_map('other'), {'a': 'b'})
+        self.assertIsNone(dist.read('PKG-INFO'))
+
+        self.assertIsNone(index.get('missing'))
+
+    def test_discovery_first_dist_wins(self):
+        self._write('one/test.lib-1.0.egg-info/PKG-INFO', '')
+        self._write('two/test.lib-2.0.egg-info/PKG-INFO', '')
+
+        index = discovery.DistributionIndex(
+            [os.path.join(self.dir, 'one'), os.path.join(self.dir, 'two')])
+        self.assertEqual(index.get('test.lib').version, '1.0')
+
+    def test_discovery_load_packages(self):
+        self._create_dists()
+
+        sys.path.append(self.dir)
+        try:
+            self.assertEqual(
+                api.loadPackages(('test.app',)),
+                ['test.plugin', 'test.app'])
+            self.assertEqual(
+                api.loadPackages(excludes=('memphis',)),
+                ['test.plugin', 'test.app'])
+        finally:
+            sys.path.remove(self.dir)
+
+    def test_discovery_index_cache(self):
+        index = discovery.getIndex()
+        self.assertIs(discovery.getIndex(), index)
+
+        sys.path.append(self.dir)
+        try:
+            self.assertIsNot(discovery.getIndex(), index)
+        finally:
+            sys.path.remove(self.dir)
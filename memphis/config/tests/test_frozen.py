@@ -0,0 +1,190 @@
+""" frozen registry tests """
+import unittest
+from zope import interface
+from zope.interface.registry import Components
+from zope.interface.interfaces import ComponentLookupError
+
+from memphis import config
+from memphis.config.frozen import FrozenRegistry
+
+
+class IContext(interface.Interface):
+    pass
+
+class IContext2(IContext):
+    pass
+
+class IAdapter(interface.Interface):
+    pass
+
+class ISubAdapter(IAdapter):
+    pass
+
+class IUtility(interface.Interface):
+    pass
+
+
+class Context(object):
+
+    def __init__(self, iface):
+        interface.directlyProvides(self, iface)
+
+
+class Adapter(object):
+
+    def __init__(self, *context):
+        self.context = context
+
+
+class TestFrozenRegistry(unittest.TestCase):
+
+    def setUp(self):
+        config.initialize(('memphis.config',), reg=Components('test'))
+
+    def tearDown(self):
+        config.cleanUp()
+
+    def test_freeze_thaw(self):
+        reg = config.registry
+
+        config.freeze()
+        self.assertTrue(isinstance(config.registry, FrozenRegistry))
+        self.assertIs(config.registry.registry, reg)
+
+        # freeze twice
+        frozen = config.registry
+        config.freeze()
+        self.assertIs(config.registry, frozen)
+
+        self.assertRaises(
+            RuntimeError,
+            config.registry.registerAdapter, Adapter, (IContext,), IAdapter)
+        self.assertRaises(
+            RuntimeError,
+            config.registry.registerUtility, object(), IUtility)
+
+        config.thaw()
+        self.assertIs(config.registry, reg)
+
+    def test_freeze_not_initialized(self):
+        config.cleanUp()
+        reg = config.registry
+        config.registry = None
+        try:
+            self.assertRaises(RuntimeError, config.freeze)
+        finally:
+            config.registry = reg
+
+    def test_frozen_adapters(self):
+        reg = config.registry
+        reg.registerAdapter(Adapter, (IContext,), ISubAdapter)
+        reg.registerAdapter(Adapter, (IContext, IContext), IAdapter, 'multi')
+
+        config.freeze()
+        frozen = config.registry
+
+        ctx = Context(IContext2)
+        adapter = frozen.queryAdapter(ctx, IAdapter)
+        self.assertTrue(isinstance(adapter, Adapter))
+        self.assertEqual(adapter.context, (ctx,))
+        self.assertTrue(isinstance(frozen.getAdapter(ctx, ISubAdapter),
+                                   Adapter))
+
+        self.assertIsNone(frozen.queryAdapter(ctx, IAdapter, 'unknown'))
+        self.assertIsNone(frozen.queryAdapter(object(), IAdapter))
+        self.assertRaises(ComponentLookupError,
+                          frozen.getAdapter, ctx, IAdapter, 'unknown')
+
+        adapter = frozen.queryMultiAdapter((ctx, ctx), IAdapter, 'multi')
+        self.assertEqual(adapter.context, (ctx, ctx))
+        self.assertIsNone(frozen.queryMultiAdapter((ctx, ctx), IAdapter))
+        self.assertRaises(ComponentLookupError,
+                          frozen.getMultiAdapter, (ctx, ctx), IAdapter)
+
+        self.assertIs(
+            frozen.adapters.lookup(
+                (interface.providedBy(ctx),), IAdapter), Adapter)
+        self.assertIs(
+            frozen.adapters.lookup1(interface.providedBy(ctx), IAdapter),
+            Adapter)
+
+    def test_frozen_adapter_factory_returns_none(self):
+        config.registry.registerAdapter(
+            lambda ctx: None, (IContext,), IAdapter)
+        config.freeze()
+
+        self.assertIs(config.registry.queryAdapter(
+                Context(IContext), IAdapter, default=1), 1)
+        self.assertIs(config.registry.queryMultiAdapter(
+                (Context(IContext),), IAdapter, default=1), 1)
+
+    def test_frozen_utilities(self):
+        util = object()
+        config.registry.registerUtility(util, IUtility)
+        config.freeze()
+
+        self.assertIs(config.registry.queryUtility(IUtility), util)
+        self.assertIs(config.registry.getUtility(IUtility), util)
+        self.assertIsNone(config.registry.queryUtility(IUtility, 'unknown'))
+        self.assertRaises(ComponentLookupError,
+                          config.registry.getUtility, IUtility, 'unknown')
+
+    def test_frozen_recompile_on_change(self):
+        reg = config.registry
+        config.freeze()
+
+        ctx = Context(IContext)
+        self.assertIsNone(config.registry.queryAdapter(ctx, IAdapter))
+
+        # registration through original registry
+        reg.registerAdapter(Adapter, (IContext,), IAdapter)
+        self.assertTrue(isinstance(
+                config.registry.queryAdapter(ctx, IAdapter), Adapter))
+
+    def test_frozen_recompile_utilities_on_change(self):
+        reg = config.registry
+        config.freeze()
+        self.assertIsNone(config.registry.queryUtility(IUtility))
+
+        # registration through original registry
+        util = object()
+        reg.registerUtility(util, IUtility)
+        self.assertIs(config.registry.queryUtility(IUtility), util)
+
+        reg.unregisterUtility(util, IUtility)
+        self.assertIsNone(config.registry.queryUtility(IUtility))
+
+    def test_frozen_utilities_extended_iface(self):
+        class ISubUtility(IUtility):
+            pass
+
+        util = object()
+        config.registry.registerUtility(util, ISubUtility, 'sub')
+        config.freeze()
+
+        self.assertIs(config.registry.queryUtility(IUtility, 'sub'), util)
+        self.assertIs(config.registry.queryUtility(ISubUtility, 'sub'), util)
+        self.assertIsNone(config.registry.queryUtility(ISubUtility))
+
+    def test_thaw_close(self):
+        reg = config.registry
+        compiled = []
+
+        for i in range(3):
+            config.freeze()
+            frozen = config.registry
+            frozen.compile = lambda: compiled.append(1)
+            config.thaw()
+
+            self.assertNotIn(frozen, reg.utilities._v_subregistries)
+            self.assertNotIn(frozen._adapters, reg.adapters._v_subregistries)
+            self.assertIsNone(frozen._adapters.registry)
+
+        reg.registerUtility(object(), IUtility)
+        self.assertEqual(compiled, [])
+
+    def test_include_frozen(self):
+        config.freeze()
+        config.include(('memphis.config.tests.test_frozen',))
+
+        self.assertTrue(isinstance(config.registry, FrozenRegistry))
@@ -0,0 +1,117 @@
+""" settings generation counter tests """
+import os, shutil, tempfile, unittest
+from zope.interface.registry import Components
+
+from memphis import config
+from memphis.config import generation
+from memphis.config.generation import GenerationCounter, GenerationWatcher
+
+
+class TestGeneration(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'settings.cfg')
+
+    def tearDown(self):
+        config.cleanUp()
+        shutil.rmtree(self.dir)
+
+    def test_counter(self):
+        path = os.path.join(self.dir, 'counter')
+        c1 = GenerationCounter(path)
+        c2 = GenerationCounter(path)
+
+        self.assertEqual(c1.value(), 0)
+        self.assertEqual(c1.increment(), 1)
+        self.assertEqual(c2.value(), 1)
+        self.assertEqual(c2.increment(), 2)
+        self.assertEqual(c1.value(), 2)
+
+        c1.close()
+        c2.close()
+
+    def test_watcher(self):
+        calls1, calls2 = [], []
+
+        w1 = GenerationWatcher(lambda: calls1.append(True))
+        w2 = GenerationWatcher(lambda: calls2.append(True))
+        w1.start(self.path)
+        w2.start(self.path)
+        w2.start(self.path)
+        self.assertTrue(os.path.exists(self.path + '.generation'))
+        self.assertEqual(len(generation._watchers), 2)
+
+        config.checkSettings()
+        self.assertEqual((calls1, calls2), ([], []))
+
+        w1.saved()
+        config.checkSettings()
+        self.assertEqual((calls1, calls2), ([], [True]))
+
+        config.checkSettings()
+        self.assertEqual((calls1, calls2), ([], [True]))
+
+        w1.stop()
+        w1.stop()
+        w1.saved()
+        self.assertEqual(generation._watchers, [w2])
+
+    def test_watcher_save_after_other_process(self):
+        calls1, calls2 = [], []
+
+        w1 = GenerationWatcher(lambda: calls1.append(True))
+        w2 = GenerationWatcher(lambda: calls2.append(True))
+        w1.start(self.path)
+        w2.start(self.path)
+
+        # w2 saves, then w1 saves before check
+        w2.saved()
+        w1.saved()
+        self.assertEqual(w1.generation, 0)
+        self.assertEqual(w2.generation, 1)
+
+        config.checkSettings()
+        self.assertEqual((calls1, calls2), ([True], [True]))
+        self.assertEqual(w1.generation, 2)
+        self.assertEqual(w2.generation, 2)
+
+    def test_storage_save(self):
+        calls = []
+
+        storage = config.FileStorage(self.path, watcherFactory=lambda h:
+                                         GenerationWatcher(calls.append))
+        storage.load()
+        watcher = storage.watcher
+        self.assertEqual(watcher.generation, 0)
+
+        storage.save({'group.node': 'value'})
+        self.assertEqual(watcher.generation, 1)
+        self.assertEqual(watcher.counter.value(), 1)
+
+        watcher.check()
+        self.assertEqual(calls, [])
+        storage.close()
+
+    def test_initialize_settings(self):
+        config.initialize(('memphis.config',), reg=Components('test'))
+        config.initializeSettings(
+            {'settings': self.path, 'watcher': 'generation'})
+
+        watcher = config.Settings.loader.watcher
+        self.assertTrue(isinstance(watcher, GenerationWatcher))
+        self.assertEqual(watcher._handler, config.Settings.load)
+
+    def test_request_check(self):
+        subscribers = []
+
+        class Configurator(object):
+            def add_subscriber(self, subscriber, iface):
+                subscribers.append((subscriber, iface))
+
+        generation.startRequestCheck(config.ApplicationStarting(None))
+        generation.startRequestCheck(
+            config.ApplicationStarting(Configurator()))
+        self.assertEqual(
+            subscribers,
+            [(config.checkSettings, 'pyramid.events.NewRequest')])
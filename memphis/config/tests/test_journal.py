@@ -0,0 +1,171 @@
+""" settings journal storage tests """
+import os, shutil, tempfile, unittest, colander, ConfigParser
+from zope.interface.registry import Components
+
+from memphis import config
+from memphis.config.journal import JournalStorage
+
+
+class TestJournalStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'settings.cfg')
+
+    def tearDown(self):
+        config.cleanUp(self.__class__.__module__)
+        shutil.rmtree(self.dir)
+
+    def _load(self, storage):
+        data = storage.load()
+        data.pop('here', None)
+        return data
+
+    def _journal(self):
+        return open(self.path + '.journal').read().splitlines()
+
+    def test_no_file(self):
+        storage = JournalStorage(None)
+        self.assertEqual(self._load(storage), {})
+        self.assertEqual(storage.save({'group.node': '1'}, ['group.node']),
+                         None)
+        self.assertEqual(storage.compact(), None)
+
+    def test_save_load(self):
+        storage = JournalStorage(self.path, section='app')
+        self.assertEqual(self._load(storage), {})
+        self.assertEqual(self._journal(), ['["#", 0]'])
+
+        storage.save({'group.node1': 'value', 'group.node2': '10'},
+                     ['group.node1'])
+        self.assertEqual(self._journal(),
+                         ['["#", 0]', '["group.node1", "value"]'])
+        self.assertEqual(self._load(storage), {'group.node1': 'value'})
+
+        # nothing to write
+        storage.save({}, [])
+        self.assertEqual(len(self._journal()), 2)
+
+        # other process reads journal
+        storage2 = JournalStorage(self.path, section='app')
+        self.assertEqual(self._load(storage2), {'group.node1': 'value'})
+
+    def test_save_changed(self):
+        storage = JournalStorage(self.path, section='app')
+        storage.save({'group.node1': 'value', 'group.node2': '10',
+                      'group.node3.0': 'a', 'group.node3.1': 'b',
+                      'group.node33': 'c'})
+
+        storage.save({'group.node1': 'new', 'group.node2': '20',
+                      'group.node3.0': 'x'}, ['group.node1', 'group.node3'])
+
+        self.assertEqual(self._load(storage),
+                         {'group.node1': 'new', 'group.node2': '10',
+                          'group.node3.0': 'x', 'group.node33': 'c'})
+
+        # changed key without value is removed
+        storage.save({}, ['group.node2'])
+        self.assertEqual(self._load(storage),
+                         {'group.node1': 'new',
+                          'group.node3.0': 'x', 'group.node33': 'c'})
+
+    def test_incremental_load(self):
+        storage1 = JournalStorage(self.path, section='app')
+        storage2 = JournalStorage(self.path, section='app')
+        storage1.load()
+        storage2.load()
+        offset = storage2._offset
+
+        storage1.save({'group.node1': 'value'}, ['group.node1'])
+        self.assertEqual(self._load(storage2), {'group.node1': 'value'})
+        self.assertTrue(storage2._offset > offset)
+
+        # incomplete record is not applied
+        offset = storage2._offset
+        f = open(self.path + '.journal', 'ab')
+        f.write('["group.node2", "1')
+        f.close()
+        self.assertEqual(self._load(storage2), {'group.node1': 'value'})
+        self.assertEqual(storage2._offset, offset)
+
+        f = open(self.path + '.journal', 'ab')
+        f.write('0"]\nbroken\n')
+        f.close()
+        self.assertEqual(self._load(storage2),
+                         {'group.node1': 'value', 'group.node2': '10'})
+
+        # compaction, journal is read again
+        storage1.compact()
+        storage1.save({'group.node3': 'value'}, ['group.node3'])
+        self.assertEqual(self._load(storage2),
+                         {'group.node1': 'value', 'group.node2': '10',
+                          'group.node3': 'value'})
+
+    def test_compact(self):
+        f = open(self.path, 'wb')
+        f.write('[app]\ngroup.node1 = base\ngroup.node2 = base\n'
+                'group.node4 = %(here)s/file\n'
+                '[other]\nkey = value\n')
+        f.close()
+
+        storage = JournalStorage(self.path, section='app', here='/tmp')
+        storage.save({'group.node1': 'new'}, ['group.node1', 'group.node2'])
+        storage.save({'group.node3.0': 'x'}, ['group.node3'])
+        storage.compact()
+
+        self.assertEqual(self._journal(), ['["#", 1]'])
+
+        parser = ConfigParser.RawConfigParser()
+        parser.read(self.path)
+        self.assertEqual(dict(parser.items('app')),
+                         {'group.node1': 'new', 'group.node3.0': 'x',
+                          'group.node4': '%(here)s/file'})
+        self.assertEqual(dict(parser.items('other')), {'key': 'value'})
+
+        self.assertEqual(storage.load(),
+                         {'group.node1': 'new', 'group.node3.0': 'x',
+                          'group.node4': '/tmp/file', 'here': '/tmp'})
+
+    def test_compact_default_section(self):
+        storage = JournalStorage(self.path)
+        storage.save({'group.node1': 'value', 'group.node2': '10'})
+        storage.save({}, ['group.node2'])
+        storage.compact()
+
+        parser = ConfigParser.RawConfigParser()
+        parser.read(self.path)
+        self.assertEqual(parser.defaults(), {'group.node1': 'value'})
+
+    def test_compact_background(self):
+        storage = JournalStorage(self.path, section='app', compactSize=50)
+        storage.save({'group.node1': 'value'}, ['group.node1'])
+        self.assertTrue(storage._compactor is None)
+
+        storage.save({'group.node1': 'value2'}, ['group.node1'])
+        storage._compactor.join(5)
+
+        self.assertEqual(self._journal(), ['["#", 1]'])
+        self.assertEqual(self._load(storage), {'group.node1': 'value2'})
+
+    def test_settings_save(self):
+        node1 = config.SchemaNode(colander.Str(), name='node1', default='d1')
+        node2 = config.SchemaNode(colander.Int(), name='node2', default=10)
+        group = config.registerSettings('group', node1, node2)
+
+        config.initialize(('memphis.config', self.__class__.__module__),
+                          reg=Components('test'))
+        config.initializeSettings(
+            {'settings': self.path, 'storage': 'journal'},
+            watcherFactory=None, section='app')
+
+        storage = config.Settings.loader
+        self.assertTrue(isinstance(storage, JournalStorage))
+
+        group['node1'] = 'value'
+        group['node2'] = 20
+        config.Settings.save()
+
+        group['node1'] = 'd1'
+        config.Settings.save()
+        self.assertEqual(self._load(storage), {'group.node2': '20'})
+        self.assertEqual(len(self._journal()), 4)
@@ -0,0 +1,72 @@
+""" lazy package namespaces tests """
+import sys, unittest
+
+from memphis.config.lazy import LazyModule
+
+
+class TestLazyModule(unittest.TestCase):
+
+    def test_packages(self):
+        import memphis
+        for name in ('memphis.config', 'memphis.view', 'memphis.form'):
+            self.assertTrue(isinstance(sys.modules[name], LazyModule))
+
+        self.assertIs(memphis.view, sys.modules['memphis.view'])
+
+    def test_api(self):
+        from memphis import config
+        from memphis.config import api
+
+        self.assertIs(config.initialize, api.initialize)
+        self.assertIn('initialize', config.__all__)
+        self.assertIn('initialize', config.__dict__)
+
+    def test_prefork_api(self):
+        from memphis import config
+        from memphis.config import prefork
+        import memphis.config.shutdown
+        shutdown = sys.modules['memphis.config.shutdown']
+
+        for name in ('serve', 'preload', 'forkWorkers', 'forkHandler',
+                     'ApplicationPreloaded'):
+            self.assertEqual(config._lazyapi[name], 'memphis.config.prefork')
+            self.assertIs(getattr(config, name), getattr(prefork, name))
+
+        for name in ('shutdown', 'shutdownHandler'):
+            self.assertEqual(config._lazyapi[name], 'memphis.config.shutdown')
+            self.assertIs(getattr(config, name), getattr(shutdown, name))
+
+    def test_submodule(self):
+        from memphis import config
+        self.assertIs(config.profiler, sys.modules['memphis.config.profiler'])
+
+    def test_unknown(self):
+        from memphis import config
+        self.assertRaises(AttributeError, getattr, config, 'unknown')
+        self.assertRaises(AttributeError, getattr, config, '__unknown__')
+        self.assertFalse(hasattr(config, 'unknown'))
+
+    def test_name_clash(self):
+        # memphis.view.pagelet is submodule and pagelet directive
+        from memphis import view
+        import memphis.view.pagelet
+        from memphis.view import directives
+
+        self.assertIs(view.pagelet, directives.pagelet)
+        self.assertIs(sys.modules['memphis.view'].pagelet, directives.pagelet)
+
+        from memphis.view import pagelet
+        self.assertIs(pagelet, directives.pagelet)
+
+    def test_name_clash_set(self):
+        from memphis import config
+        import memphis.config.shutdown
+
+        orig = config.shutdown
+        self.assertIs(orig, sys.modules['memphis.config.shutdown'].shutdown)
+
+        config.shutdown = None
+        try:
+            self.assertIsNone(config.shutdown)
+        finally:
+            config.shutdown = orig
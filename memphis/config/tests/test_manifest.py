@@ -0,0 +1,181 @@
+""" actions manifest tests """
+import os, sys, time, shutil, tempfile, unittest
+from zope import interface
+from zope.interface.registry import Components
+
+from memphis import config
+from memphis.config import directives
+from memphis.config.manifest import ActionManifest
+
+
+class IContext(interface.Interface):
+    pass
+
+
+class TestManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.dir, 'manifest')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+        config.cleanUp(self.__class__.__module__)
+
+        global testAction1, testAction2
+        try:
+            del testAction1
+        except:
+            pass
+        try:
+            del testAction2
+        except:
+            pass
+
+    def _register(self):
+        global testAction1, testAction2
+
+        processed = []
+
+        @config.action
+        def testAction1():
+            processed.append(1)
+
+        @config.subscriber(IContext)
+        def testAction2(ev):
+            processed.append(2)
+
+        return processed
+
+    def test_manifest_save_load(self):
+        processed = self._register()
+
+        packages = (self.__class__.__module__,)
+        config.initialize(packages, reg=Components('test'),
+                          manifest=self.filename)
+
+        self.assertTrue(os.path.exists(self.filename))
+        self.assertEqual(processed, [1])
+
+        manifest = ActionManifest(self.filename)
+        actions = manifest.load(list(packages))
+        self.assertEqual(
+            actions, directives.ACTIONS[self.__class__.__module__])
+
+        config.initialize(packages, reg=Components('test'),
+                          manifest=self.filename)
+        self.assertEqual(processed, [1, 1])
+
+    def test_manifest_missing(self):
+        manifest = ActionManifest(self.filename)
+        self.assertIsNone(manifest.load(['memphis.config']))
+
+    def test_manifest_broken(self):
+        f = open(self.filename, 'wb')
+        f.write('broken')
+        f.close()
+
+        manifest = ActionManifest(self.filename)
+        self.assertIsNone(manifest.load(['memphis.config']))
+
+    def test_manifest_different_packages(self):
+        self._register()
+
+        config.initialize((self.__class__.__module__,),
+                          reg=Components('test'), manifest=self.filename)
+
+        manifest = ActionManifest(self.filename)
+        self.assertIsNone(manifest.load(['memphis.config']))
+        self.assertIsNone(
+            manifest.load([self.__class__.__module__], ('memphis',)))
+
+    def test_manifest_changed_mtime(self):
+        self._register()
+
+        packages = [self.__class__.__module__]
+        manifest = ActionManifest(self.filename)
+        manifest.save(packages, (), packages,
+                      directives.ACTIONS[self.__class__.__module__])
+        self.assertIsNotNone(manifest.load(packages))
+
+        data = manifest._mtimes(packages)
+        for path in data:
+            os.utime(path, (time.time(), data[path] + 10))
+        try:
+            self.assertIsNone(manifest.load(packages))
+        finally:
+            for path, mtime in data.items():
+                os.utime(path, (time.time(), mtime))
+
+    def test_manifest_changed_actions(self):
+        self._register()
+
+        packages = [self.__class__.__module__]
+        manifest = ActionManifest(self.filename)
+        manifest.save(packages, (), packages,
+                      directives.ACTIONS[self.__class__.__module__])
+
+        directives.ACTIONS[self.__class__.__module__].pop()
+        self.assertIsNone(manifest.load(packages))
+
+    def _writeManifest(self, modname):
+        import cPickle
+        self._register()
+
+        packages = [self.__class__.__module__]
+        manifest = ActionManifest(self.filename)
+        manifest.save(packages, (), packages,
+                      directives.ACTIONS[self.__class__.__module__])
+
+        # module without actions, it has import side effect
+        f = open(os.path.join(self.dir, '%s.py'%modname), 'w')
+        f.write('import sys\nsys.memphis_test_imported = True\n')
+        f.close()
+
+        f = open(self.filename, 'rb')
+        data = cPickle.load(f)
+        f.close()
+        data['modules'].append(modname)
+        f = open(self.filename, 'wb')
+        cPickle.dump(data, f)
+        f.close()
+
+        sys.path.insert(0, self.dir)
+        return packages
+
+    def _cleanModule(self, modname):
+        sys.path.remove(self.dir)
+        sys.modules.pop(modname, None)
+        if hasattr(sys, 'memphis_test_imported'):
+            del sys.memphis_test_imported
+
+    def test_manifest_imports_modules_without_actions(self):
+        modname = 'memphis_manifest_noactions'
+        packages = self._writeManifest(modname)
+        try:
+            manifest = ActionManifest(self.filename)
+            actions = manifest.load(packages)
+            self.assertEqual(
+                actions, directives.ACTIONS[self.__class__.__module__])
+            self.assertIn(modname, manifest.modules)
+            self.assertIn(modname, sys.modules)
+            self.assertTrue(sys.memphis_test_imported)
+        finally:
+            self._cleanModule(modname)
+
+    def test_manifest_skip_imports(self):
+        modname = 'memphis_manifest_noactions'
+        packages = self._writeManifest(modname)
+        try:
+            manifest = ActionManifest(self.filename, skipImports=True)
+            actions = manifest.load(packages)
+            self.assertEqual(
+                actions, directives.ACTIONS[self.__class__.__module__])
+
+            # module is recorded as scanned, but it is not imported,
+            # its side effects are missing
+            self.assertIn(modname, manifest.modules)
+            self.assertNotIn(modname, sys.modules)
+            self.assertFalse(hasattr(sys, 'memphis_test_imported'))
+        finally:
+            self._cleanModule(modname)
@@ -0,0 +1,91 @@
+""" prefork tests """
+import os, gc, tempfile, shutil, unittest
+from zope.interface.registry import Components
+
+from memphis import config
+from memphis.config import api, prefork
+
+
+class TestPrefork(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.handlers = prefork._forkHandlers[:]
+
+    def tearDown(self):
+        gc.enable()
+        prefork._forkHandlers[:] = self.handlers
+        shutil.rmtree(self.dir)
+        config.cleanUp()
+
+    def test_preload(self):
+        config.preload(('memphis.config',), reg=Components('test'))
+        self.assertFalse(gc.isenabled())
+        self.assertTrue(config.Settings.initialized)
+
+        prefork.afterFork()
+        self.assertTrue(gc.isenabled())
+
+    def test_preload_config(self):
+        class Configurator(object):
+            pass
+
+        cfg = Configurator()
+        config.preload(('memphis.config',), reg=Components('test'),
+                       config=cfg)
+        self.assertIs(config.Settings.config, cfg)
+
+    def test_preload_event(self):
+        events = []
+        reg = Components('test')
+        reg.registerHandler(events.append, (config.ApplicationPreloaded,))
+
+        config.preload(('memphis.config',), reg=reg)
+        self.assertEqual(len(events), 1)
+        self.assertTrue(
+            isinstance(events[0], config.ApplicationPreloaded))
+
+    def test_after_fork(self):
+        calls = []
+        config.forkHandler(lambda: calls.append(True))
+
+        gc.disable()
+        threshold = gc.get_threshold()
+        try:
+            prefork.afterFork((1000, 20, 20))
+            self.assertEqual(gc.get_threshold(), (1000, 20, 20))
+        finally:
+            gc.set_threshold(*threshold)
+
+        self.assertTrue(gc.isenabled())
+        self.assertEqual(calls, [True])
+
+    def test_after_fork_watch_service(self):
+        from memphis.config.watch import watchService
+
+        watchService.watch(self.dir, lambda path, isdir: None, poll=True)
+        thread = watchService._thread
+
+        # forked process without settings watcher
+        config.Settings.loader = None
+        watchService._pid = -1
+        prefork.afterFork()
+
+        self.assertEqual(watchService._pid, os.getpid())
+        self.assertFalse(watchService._thread is thread)
+        self.assertTrue(watchService._thread.is_alive())
+
+    def test_serve(self):
+        path = self.dir
+
+        def worker():
+            f = open(os.path.join(path, str(os.getpid())), 'w')
+            f.write('%s'%gc.isenabled())
+            f.close()
+
+        config.serve(2, worker)
+
+        files = os.listdir(path)
+        self.assertEqual(len(files), 2)
+        for name in files:
+            self.assertEqual(open(os.path.join(path, name)).read(), 'True')
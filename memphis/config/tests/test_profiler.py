@@ -0,0 +1,94 @@
+""" startup profiler tests """
+import json, unittest
+from zope.interface.registry import Components
+
+from memphis import config
+
+
+class TestProfiler(unittest.TestCase):
+
+    def tearDown(self):
+        config.cleanUp(self.__class__.__module__)
+
+        global testAction, testSubscriber
+        try:
+            del testAction
+        except:
+            pass
+        try:
+            del testSubscriber
+        except:
+            pass
+
+    def _init_memphis(self):
+        global testAction, testSubscriber
+
+        events = []
+
+        @config.action
+        def testAction():
+            pass
+
+        @config.subscriber(config.SettingsInitializing)
+        def testSubscriber(ev):
+            events.append(ev)
+
+        profiler = config.Profiler()
+        config.initialize(
+            (self.__class__.__module__,),
+            reg=Components('test'), profiler=profiler)
+        config.initializeSettings({})
+
+        self.assertEqual(len(events), 1)
+        return profiler
+
+    def test_profiler_records(self):
+        profiler = self._init_memphis()
+
+        self.assertIn(
+            self.__class__.__module__, [m for t, m in profiler.imports])
+        self.assertEqual(len(profiler.actions), 2)
+        self.assertIn(
+            (config.SettingsInitializing.__module__ +
+             '.SettingsInitializing',
+             self.__class__.__module__ + '.testSubscriber'),
+            [(ev, h) for t, ev, h in profiler.subscribers])
+
+    def test_profiler_report(self):
+        profiler = self._init_memphis()
+
+        report = profiler.report()
+        self.assertIn('Module imports', report)
+        self.assertIn('test_profiler.py', report)
+        self.assertIn('SettingsInitializing: %s.testSubscriber'%(
+                self.__class__.__module__), report)
+
+        data = json.loads(profiler.json(limit=1))
+        self.assertEqual(len(data['actions']), 1)
+        self.assertEqual(len(data['subscribers']), 1)
+        self.assertEqual(
+            sorted(data['total'].keys()),
+            ['actions', 'imports', 'subscribers'])
+
+    def test_profiler_deactivated(self):
+        from memphis.config import api
+
+        self._init_memphis()
+        self.assertIsNotNone(api._profiler)
+
+        config.initialize(('memphis.config',), reg=Components('test'))
+        self.assertIsNone(api._profiler)
+
+    def test_profiler_stopped_on_start(self):
+        from memphis.config import api
+
+        profiler = self._init_memphis()
+        self.assertIsNotNone(api._profiler)
+
+        config.start(None)
+        self.assertIsNone(api._profiler)
+
+        # runtime events are not recorded
+        subscribers = list(profiler.subscribers)
+        config.notify(config.SettingsInitializing(None))
+        self.assertEqual(profiler.subscribers, subscribers)
@@ -78,6 +78,115 @@ class TestMemphisSequence(TestSequence):
         result = node.flatten([1, 2])
         self.assertEqual(result, {'node.0': 1, 'node.1': 2})
 
+    def test_schema_sequence_of_mapping(self):
+        from memphis.config.schema import Mapping
+
+        item = colander.SchemaNode(
+            Mapping(),
+            colander.SchemaNode(colander.Int(), name='a'),
+            colander.SchemaNode(self._makeOne(),
+                                colander.SchemaNode(colander.Int()),
+                                name='b'),
+            name = 'item')
+        node = colander.SchemaNode(
+            Mapping(),
+            colander.SchemaNode(self._makeOne(), item, name = 'node'))
+
+        appstruct = {'node': [{'a': 1, 'b': [1, 2]}, {'a': 2, 'b': []}]}
+        fstruct = node.flatten(appstruct)
+        self.assertEqual(
+            fstruct, {'node.0.a': 1, 'node.0.b.0': 1, 'node.0.b.1': 2,
+                      'node.1.a': 2})
+        self.assertEqual(
+            node.unflatten(fstruct),
+            {'node': [{'a': 1, 'b': [1, 2]}, {'a': 2}]})
+
+        # missing item
+        self.assertRaises(
+            KeyError, node.unflatten, {'node.0.a': 1, 'node.2.a': 2})
+
+
+class TestSchemaIndex(unittest.TestCase):
+
+    def _makeOne(self, node):
+        from memphis.config.schema import SchemaIndex
+        return SchemaIndex(node)
+
+    def _schema(self):
+        from memphis.config.schema import Mapping, Sequence
+
+        return colander.SchemaNode(
+            Mapping(),
+            colander.SchemaNode(
+                Mapping(),
+                colander.SchemaNode(colander.Int(), name='a'),
+                colander.SchemaNode(
+                    Sequence(),
+                    colander.SchemaNode(
+                        Mapping(),
+                        colander.SchemaNode(colander.Str(), name='c'),
+                        colander.SchemaNode(
+                            colander.Tuple(),
+                            colander.SchemaNode(colander.Int(), name='x'),
+                            colander.SchemaNode(colander.Int(), name='y'),
+                            name='d'),
+                        name='item'),
+                    name='b'),
+                name='group'))
+
+    def test_schema_index_flatten(self):
+        node = self._schema()
+        index = self._makeOne(node)
+
+        appstruct = {'group': {'a': 1, 'b': [{'c': 'v', 'd': (1, 2)},
+                                             {'c': 'w'}]}}
+        fstruct = index.flatten(appstruct)
+        self.assertEqual(
+            fstruct, {'group.a': 1, 'group.b.0.c': 'v',
+                      'group.b.0.d.x': 1, 'group.b.0.d.y': 2,
+                      'group.b.1.c': 'w'})
+        self.assertEqual(node.flatten(appstruct), fstruct)
+
+    def test_schema_index_unflatten(self):
+        node = self._schema()
+        index = self._makeOne(node)
+
+        fstruct = {'group.a': 1, 'group.b.0.c': 'v',
+                   'group.b.0.d.x': 1, 'group.b.0.d.y': 2,
+                   'group.b.1.c': 'w', 'group.b.1.unknown': 'w',
+                   'unknown.a': 1}
+        result = {'group': {'a': 1, 'b': [{'c': 'v', 'd': (1, 2)},
+                                          {'c': 'w'}]}}
+        self.assertEqual(index.unflatten(fstruct), result)
+        self.assertEqual(node.unflatten(fstruct), result)
+
+        # path to non leaf node
+        self.assertEqual(index.unflatten({'group': 1, 'group.b': 1}),
+                         {'group': {'b': []}})
+
+        # path below leaf node
+        self.assertRaises(
+            AssertionError, index.unflatten, {'group.a.b': 1})
+
+    def test_schema_index_strict_mapping(self):
+        node = colander.SchemaNode(
+            colander.Mapping(),
+            colander.SchemaNode(colander.Int(), name='a'),
+            name='node')
+        index = self._makeOne(node)
+
+        self.assertEqual(index.flatten({}), {'node.a': colander.null})
+        self.assertEqual(index.unflatten({'node': 1, 'node.a': 1}), {'a': 1})
+        self.assertRaises(KeyError, index.unflatten, {'node.b': 1})
+        self.assertRaises(AssertionError, index.unflatten, {'other.b': 1})
+
+    def test_schema_index_other_node(self):
+        node = colander.SchemaNode(colander.Int(), name='node')
+        index = self._makeOne(node)
+
+        self.assertEqual(index.flatten(1), {'node': 1})
+        self.assertEqual(index.unflatten({'node': 1}), 1)
+
 
 class TestMemphisString(unittest.TestCase):
 
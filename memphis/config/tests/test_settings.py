@@ -1,5 +1,6 @@
 import time
 import unittest, os, shutil, tempfile, colander
+from zope import interface
 from zope.interface.registry import Components
 from zope.interface.interface import InterfaceClass
 from zope.interface.interfaces import IObjectEvent
@@ -176,6 +177,68 @@ class TestSettings(BaseTesting):
         data = dict(config.Settings.export())
         self.assertEqual(data, {'group4.node2': 'changed'})
 
+    def test_settings_export_cache(self):
+        group = self._create_default_group()
+        group.update({'node1': 'val1', 'node2': 10})
+
+        self.assertEqual(config.Settings.export(), {'group.node1': 'val1'})
+        self.assertTrue('group' in config.Settings._exported)
+
+        serialized = []
+        schema = group.schema
+        serialize = schema.serialize
+        schema.serialize = lambda *a: serialized.append(1) or serialize(*a)
+
+        # cached
+        self.assertEqual(config.Settings.export(), {'group.node1': 'val1'})
+        self.assertEqual(serialized, [])
+
+        # group is changed
+        group['node2'] = 20
+        self.assertFalse('group' in config.Settings._exported)
+        self.assertEqual(config.Settings.export(),
+                         {'group.node1': 'val1', 'group.node2': '20'})
+        self.assertEqual(serialized, [1])
+
+        self.assertEqual(config.Settings.export(groups=()), {})
+        self.assertEqual(config.Settings.export(True, groups=('group',)),
+                         {'group.node1': 'val1', 'group.node2': '20'})
+
+        del schema.serialize
+
+    def test_settings_defaults_cache(self):
+        group = self._create_default_group()
+
+        defaults = config.Settings.defaults()
+        self.assertEqual(defaults['group.node1'], 'default1')
+        self.assertEqual(defaults['group.node2'], '10')
+        self.assertTrue(config.Settings.defaults() is defaults)
+
+        config.Settings._load({'group.node1': 'val1'}, setdefaults=True)
+        self.assertEqual(config.Settings.defaults()['group.node1'], 'val1')
+
+        config.Settings.init(None)
+        self.assertEqual(config.Settings.defaults()['group.node1'], 'default1')
+
+        group.register(config.SchemaNode(
+                colander.Str(), name = 'node3', default = 'default3'))
+        self.assertEqual(config.Settings.defaults()['group.node3'], 'default3')
+
+    def test_settings_index_cache(self):
+        group = self._create_default_group()
+
+        index = config.Settings.index()
+        self.assertTrue(config.Settings.index() is index)
+        self.assertEqual(index.unflatten({'group.node1': 'val1'}),
+                         {'group': {'node1': 'val1'}})
+
+        group.register(config.SchemaNode(
+                colander.Str(), name = 'node3', default = 'default3'))
+        self.assertFalse(config.Settings.index() is index)
+        self.assertEqual(
+            config.Settings.index().unflatten({'group.node3': 'val3'}),
+            {'group': {'node3': 'val3'}})
+
     def _create_default_group(self):
         node1 = config.SchemaNode(
                 colander.Str(),
@@ -390,6 +453,104 @@ class TestSettings(BaseTesting):
         self.assertEqual(group['node1'], 'new-value')
         self.assertEqual(group['node2'], 60)
 
+    def _reload_loader(self, data):
+        class Loader(object):
+            def load(self):
+                return dict(data)
+            def loadDefaults(self):
+                return {}
+            def close(self):
+                pass
+        return Loader()
+
+    def _events(self):
+        events = []
+        def h(grp, ev):
+            events.append(grp.name)
+        config.registry.registerHandler(
+            h, (interface.Interface, config.SettingsGroupModified))
+        return events
+
+    def test_settings_reload_incremental(self):
+        group = self._create_default_group()
+        group2 = config.registerSettings(
+            'group2', config.SchemaNode(
+                colander.Int(), name='node', default=1))
+        self._init_memphis()
+
+        data = {'group.node1': 'value', 'group.node2': '20',
+                'group2.node': '5', 'unknown.node': '1'}
+        config.Settings.init(self._reload_loader(data))
+        self.assertEqual(dict(group), {'node1': 'value', 'node2': 20})
+        self.assertEqual(dict(group2), {'node': 5})
+
+        events = self._events()
+
+        # nothing changed
+        config.Settings.load()
+        self.assertEqual(events, [])
+
+        data['group.node2'] = '30'
+        data['unknown.node'] = '2'
+        config.Settings.load()
+        self.assertEqual(dict(group), {'node1': 'value', 'node2': 30})
+        self.assertEqual(events, ['group'])
+
+        # removed key, default value
+        del data['group2.node']
+        config.Settings.load()
+        self.assertEqual(dict(group2), {'node': 1})
+        self.assertEqual(events, ['group', 'group2'])
+
+        # invalid value, default value
+        data['group.node2'] = 'abc'
+        config.Settings.load()
+        self.assertEqual(dict(group), {'node1': 'value', 'node2': 10})
+
+        # same value
+        data['group.node2'] = '10'
+        config.Settings.load()
+        self.assertEqual(events, ['group', 'group2', 'group'])
+
+    def test_settings_reload_group_validator(self):
+        def validator(node, appstruct):
+            if appstruct and appstruct.get('node1') == 'invalid':
+                raise colander.Invalid(node['node1'], 'Error')
+
+        node1 = config.SchemaNode(colander.Str(), name='node1', default='d')
+        node2 = config.SchemaNode(colander.Str(), name='node2', default='d')
+        group = config.registerSettings(
+            'group3', node1, node2, validator=validator)
+        self._init_memphis()
+
+        data = {'group3.node1': 'value'}
+        config.Settings.init(self._reload_loader(data))
+        self.assertEqual(dict(group), {'node1': 'value', 'node2': 'd'})
+
+        data['group3.node1'] = 'invalid'
+        config.Settings.load()
+        self.assertEqual(dict(group), {'node1': 'd', 'node2': 'd'})
+
+    def test_settings_reload_group_validator_events(self):
+        group = self._create_default_group()
+        group3 = config.registerSettings(
+            'group3', config.SchemaNode(colander.Str(), name='node1',
+                                        default='d'),
+            validator=lambda node, appstruct: None)
+        self._init_memphis()
+
+        data = {'group.node1': 'value', 'group3.node1': 'value'}
+        config.Settings.init(self._reload_loader(data))
+        events = self._events()
+
+        # both groups are changed, one of them has validator
+        data['group.node1'] = 'value2'
+        data['group3.node1'] = 'value2'
+        config.Settings.load()
+        self.assertEqual(sorted(events), ['group', 'group3'])
+        self.assertEqual(group['node1'], 'value2')
+        self.assertEqual(group3['node1'], 'value2')
+
     def test_settings_save(self):
         class Loader(object):
             def load(self):
@@ -427,6 +588,157 @@ class TestSettings(BaseTesting):
         self.assertEqual(saved, {'group.node1': 'val', 'group.node2': '90'})
         self.assertTrue(len(events) == 1)
 
+    def test_settings_snapshot(self):
+        group = self._create_default_group()
+        self.assertEqual(len(group.snapshot), 0)
+
+        group.update({'node1': 'val1', 'node2': 20})
+        snapshot = group.snapshot
+        self.assertEqual(snapshot.node1, 'val1')
+        self.assertEqual(snapshot['node2'], 20)
+        self.assertTrue('node1' in snapshot)
+        self.assertEqual(sorted(snapshot), ['node1', 'node2'])
+
+        self.assertRaises(
+            AttributeError, setattr, snapshot, 'node1', 'val2')
+        self.assertRaises(
+            AttributeError, delattr, snapshot, 'node1')
+
+        group['node1'] = 'val2'
+        self.assertEqual(snapshot.node1, 'val1')
+        self.assertEqual(group.snapshot.node1, 'val2')
+
+        del group['node1']
+        self.assertFalse('node1' in group.snapshot)
+
+    def test_settings_snapshot_compiled(self):
+        from memphis.config.settings import CompiledSnapshot
+
+        node = config.SchemaNode(colander.Str(), name='node1', default='d1')
+        group = config.registerSettings('group', node, compiled=True)
+        self._init_memphis()
+
+        snapshot = group.snapshot
+        self.assertTrue(isinstance(snapshot, CompiledSnapshot))
+        self.assertFalse(hasattr(snapshot, '__dict__'))
+        self.assertEqual(snapshot.__slots__, ('node1',))
+        self.assertEqual(snapshot.node1, 'd1')
+        self.assertEqual(snapshot['node1'], 'd1')
+        self.assertEqual(list(snapshot), ['node1'])
+        self.assertEqual(len(snapshot), 1)
+        self.assertRaises(
+            AttributeError, setattr, snapshot, 'node1', 'val')
+        self.assertRaises(
+            AttributeError, delattr, snapshot, 'node1')
+
+        # reload
+        config.Settings._load({'group.node1': 'val1'})
+        self.assertEqual(group.snapshot.node1, 'val1')
+        self.assertEqual(snapshot.node1, 'd1')
+
+        group.clear()
+        self.assertFalse('node1' in group.snapshot)
+        self.assertRaises(KeyError, group.snapshot.__getitem__, 'node1')
+
+    def test_settings_snapshot_compiled_identifier(self):
+        from memphis.config.settings import GroupSnapshot
+
+        node = config.SchemaNode(colander.Str(), name='node-1', default='d1')
+        group = config.registerSettings('group', node, compiled=True)
+        self._init_memphis()
+
+        self.assertTrue(isinstance(group.snapshot, GroupSnapshot))
+        self.assertEqual(group.snapshot['node-1'], 'd1')
+
+    def test_settings_snapshot_accessor(self):
+        group = self._create_default_group()
+        group.update({'node1': 'val', 'node2': 20})
+
+        group.addAccessor(
+            'full', lambda values: '%s-%s'%(values['node1'], values['node2']))
+        self.assertEqual(group.snapshot.full, 'val-20')
+        self.assertFalse('full' in group)
+
+        group['node2'] = 30
+        self.assertEqual(group.snapshot.full, 'val-30')
+
+        group.compile()
+        self.assertEqual(group.snapshot.__slots__, ('node1', 'node2', 'full'))
+        self.assertEqual(group.snapshot.full, 'val-30')
+
+        # accessor is not computed for not populated group
+        group.clear()
+        self.assertFalse('full' in group.snapshot)
+
+    def test_settings_snapshot_accessor_error(self):
+        group = self._create_default_group()
+        group.update({'node1': 'val', 'node2': 20})
+
+        group.addAccessor('full', lambda values: 1/0)
+        self.assertFalse('full' in group.snapshot)
+
+        # snapshot is swapped without failed accessor
+        group['node1'] = 'val2'
+        self.assertEqual(group.snapshot['node1'], 'val2')
+        self.assertFalse('full' in group.snapshot)
+
+    def test_settings_snapshot_pin(self):
+        import threading
+
+        group = self._create_default_group()
+        group.update({'node1': 'val1'})
+
+        self.assertTrue(group.pinned() is group.snapshot)
+
+        config.Settings.pin()
+        group['node1'] = 'val2'
+        self.assertEqual(group.pinned().node1, 'val1')
+
+        # other threads see current snapshot
+        values = []
+        t = threading.Thread(
+            target=lambda: values.append(group.pinned().node1))
+        t.start()
+        t.join()
+        self.assertEqual(values, ['val2'])
+
+        config.Settings.unpin()
+        self.assertEqual(group.pinned().node1, 'val2')
+
+    def test_settings_snapshot_request(self):
+        from memphis.config.settings import startRequestPin, pinRequest
+
+        group = self._create_default_group()
+        group.update({'node1': 'val1'})
+
+        class Config(object):
+            def add_subscriber(self, func, iface):
+                subscribers.append((func, iface))
+
+        class Request(object):
+            def add_finished_callback(self, func):
+                callbacks.append(func)
+
+        class Event(object):
+            pass
+
+        subscribers = []
+        callbacks = []
+
+        ev = Event()
+        ev.config = Config()
+        startRequestPin(ev)
+        self.assertEqual(
+            subscribers, [(pinRequest, 'pyramid.events.NewRequest')])
+
+        ev.request = Request()
+        pinRequest(ev)
+        group['node1'] = 'val2'
+        self.assertEqual(group.pinned().node1, 'val1')
+
+        callbacks[0](ev.request)
+        self.assertEqual(group.pinned().node1, 'val2')
+
 
 class TestFileStorage(BaseTesting):
 
@@ -0,0 +1,149 @@
+""" watch service tests """
+import os, time, shutil, tempfile, threading, unittest
+from zope.interface.registry import Components
+
+from memphis import config
+from memphis.config import watch
+from memphis.config.watch import WatchService
+
+
+class TestWatchService(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'settings.cfg')
+        self._write(self.path, 'value')
+
+        self.events = []
+        self.service = WatchService(interval=0.05, delay=0.03)
+
+    def tearDown(self):
+        self.service.clear()
+        config.cleanUp()
+        shutil.rmtree(self.dir)
+
+    def _write(self, path, data):
+        f = open(path, 'wb')
+        f.write(data)
+        f.close()
+
+    def _handler(self, path, isdir):
+        self.events.append((path, isdir))
+
+    def _wait(self, count=1, timeout=5):
+        t = time.time() + timeout
+        while len(self.events) < count and time.time() < t:
+            time.sleep(0.01)
+        time.sleep(0.1)
+
+    def test_file(self):
+        self.service.watch(self.path, self._handler)
+
+        # events are debounced
+        self._write(self.path, 'value1')
+        self._write(self.path, 'value2')
+        self._wait()
+        self.assertEqual(self.events, [(self.path, False)])
+
+    def test_file_poll(self):
+        w = self.service.watch(self.path, self._handler, poll=True)
+        self.assertTrue(w.poll)
+
+        self._write(self.path, 'value12')
+        self._wait()
+        self.assertEqual(self.events, [(self.path, False)])
+
+    def test_directory(self):
+        for poll in (False, True):
+            self.events = []
+            w = self.service.watch(self.dir, self._handler, True, poll)
+
+            path = os.path.join(self.dir, 'pkg')
+            os.mkdir(path)
+            self._write(os.path.join(path, 'file.pt'), '')
+            self._wait(2)
+            self.assertEqual(
+                sorted(self.events),
+                [(path, True), (os.path.join(path, 'file.pt'), False)])
+
+            self.events = []
+            shutil.rmtree(path)
+            self._wait(2)
+            self.assertEqual(
+                sorted(self.events),
+                [(path, True), (os.path.join(path, 'file.pt'), False)])
+
+            self.service.unwatch(w)
+
+    def test_single_thread(self):
+        threads = threading.active_count()
+
+        self.service.watch(self.path, self._handler)
+        self.service.watch(self.dir, self._handler, True)
+        self.service.watch(self.dir, self._handler, poll=True)
+        self.assertEqual(threading.active_count(), threads + 1)
+
+        self.service.stop()
+        self.assertEqual(threading.active_count(), threads)
+
+        # watches are restored
+        self.service.start()
+        self._write(self.path, 'value1')
+        self._wait()
+        self.assertEqual(self.events, [(self.path, False)])
+
+    def test_unwatch(self):
+        w = self.service.watch(self.path, self._handler)
+        self.service.unwatch(w)
+        self.service.unwatch(w)
+        self.assertFalse(w.active)
+
+        self._write(self.path, 'value1')
+        time.sleep(0.2)
+        self.assertEqual(self.events, [])
+
+    def test_handler_error(self):
+        def handler(path, isdir):
+            self.events.append(path)
+            raise ValueError()
+
+        self.service.watch(self.path, handler)
+        self._write(self.path, 'value1')
+        self._wait()
+        self._write(self.path, 'value2')
+        self._wait(2)
+        self.assertEqual(self.events, [self.path, self.path])
+
+    def test_restart(self):
+        self.service.watch(self.path, self._handler)
+        thread = self.service._thread
+
+        # same process
+        self.service.restart()
+        self.assertTrue(self.service._thread is thread)
+
+        # forked process
+        self.service._pid = -1
+        self.service.restart()
+        self.assertFalse(self.service._thread is thread)
+        thread.join(5)
+
+        self._write(self.path, 'value1')
+        self._wait()
+        self.assertEqual(self.events, [(self.path, False)])
+
+    def test_initialize_settings(self):
+        interval = watch.watchService.interval
+
+        self._write(self.path, '[DEFAULT]\n')
+        config.initialize(('memphis.config',), reg=Components('test'))
+        config.initializeSettings(
+            {'settings': self.path, 'watcher': 'poll',
+             'watch_interval': '0.5'}, config=object())
+
+        self.assertEqual(watch.watchService.interval, 0.5)
+        watcher = config.Settings.loader.watcher
+        self.assertTrue(watcher.poll)
+        self.assertTrue(watcher._watch.poll)
+
+        watch.watchService.interval = interval
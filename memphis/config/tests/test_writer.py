@@ -0,0 +1,127 @@
+""" background settings writer tests """
+import os, time, shutil, tempfile, threading, unittest, colander
+from zope.interface.registry import Components
+from zope.interface.interfaces import IObjectEvent
+
+from memphis import config
+from memphis.config.api import objectEventNotify
+from memphis.config.settings import shutdown
+from memphis.config.writer import BackgroundWriter
+
+
+class TestBackgroundWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.writes = []
+        self.written = threading.Event()
+
+    def write(self, changed):
+        self.writes.append(changed)
+        self.written.set()
+
+    def test_coalesce(self):
+        writer = BackgroundWriter(self.write, 0.05)
+        writer.schedule(['group.node1'])
+        writer.schedule(['group.node2', 'group.node1'])
+        writer.schedule()
+        self.assertEqual(self.writes, [])
+
+        self.written.wait(5)
+        self.assertEqual(self.writes, [['group.node1', 'group.node2']])
+
+        # next change starts new window
+        self.written.clear()
+        writer.schedule(['group.node3'])
+        self.written.wait(5)
+        self.assertEqual(self.writes[1:], [['group.node3']])
+
+    def test_flush(self):
+        writer = BackgroundWriter(self.write, 60)
+        writer.flush()
+        self.assertEqual(self.writes, [])
+
+        writer.schedule(['group.node1'])
+        timer = writer._timer
+        writer.flush()
+        self.assertEqual(self.writes, [['group.node1']])
+        self.assertTrue(writer._timer is None)
+
+        timer.join(5)
+        self.assertFalse(timer.is_alive())
+        self.assertEqual(self.writes, [['group.node1']])
+
+    def test_cancel(self):
+        writer = BackgroundWriter(self.write, 60)
+        writer.schedule(['group.node1'])
+        writer.cancel()
+        writer.flush()
+        self.assertEqual(self.writes, [])
+
+    def test_write_error(self):
+        def write(changed):
+            raise ValueError()
+
+        writer = BackgroundWriter(write, 60)
+        writer.schedule(['group.node1'])
+        writer.flush()
+        self.assertFalse(writer.pending)
+
+
+class TestSettingsWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'settings.cfg')
+
+    def tearDown(self):
+        config.cleanUp(self.__class__.__module__)
+        shutil.rmtree(self.dir)
+
+    def _init_memphis(self, settings):
+        self.group = config.registerSettings(
+            'group',
+            config.SchemaNode(colander.Str(), name='node1', default='d1'),
+            config.SchemaNode(colander.Int(), name='node2', default=10))
+
+        config.initialize(
+            ('memphis.config', self.__class__.__module__),
+            reg = Components('test'))
+        config.initializeSettings(settings, watcherFactory=None)
+
+    def test_initialize_settings(self):
+        self._init_memphis({'settings': self.path})
+        self.assertTrue(config.Settings.writer is None)
+
+        config.cleanUp(self.__class__.__module__)
+        self._init_memphis({'settings': self.path, 'write_delay': '0.5'})
+        self.assertTrue(isinstance(config.Settings.writer, BackgroundWriter))
+        self.assertEqual(config.Settings.writer.delay, 0.5)
+
+    def test_save(self):
+        self._init_memphis({'settings': self.path, 'write_delay': '60'})
+
+        events = []
+        def h(grp, ev):
+            events.append(ev.object.name)
+
+        sm = config.registry
+        sm.registerHandler(h, (self.group.category,
+                               config.SettingsGroupModified))
+        sm.registerHandler(objectEventNotify, (IObjectEvent,))
+
+        saves = []
+        loader = config.Settings.loader
+        save = loader.save
+        loader.save = lambda data: saves.append(data) or save(data)
+
+        for i in range(5):
+            self.group['node2'] = i + 1
+            config.Settings.save()
+
+        # events are sent on every save, file is not written yet
+        self.assertEqual(events, ['group']*5)
+        self.assertEqual(saves, [])
+
+        shutdown()
+        self.assertEqual(saves, [{'group.node2': '5'}])
+        self.assertTrue('node2 = 5' in open(self.path).read())
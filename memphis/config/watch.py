@@ -0,0 +1,266 @@
+""" process wide filesystem watch service """
+import os, stat, time, logging, threading
+
+import api, shutdown
+
+try:
+    import pyinotify
+except ImportError: # pragma: no cover
+    pyinotify = None
+
+log = logging.getLogger('memphis.config')
+
+
+class Watch(object):
+    """ Watched path. File watch reports file modifications, directory
+    watch reports created and removed entries. """
+
+    wd = None
+    active = True
+
+    def __init__(self, path, handler, recursive=False, poll=False):
+        self.path = path
+        self.handler = handler
+        self.recursive = recursive
+        self.poll = poll or pyinotify is None
+        self.entries = None
+
+
+class WatchService(object):
+    """ Watches all paths in one thread. Inotify watches share one
+    inotify instance, other paths are checked by poller every
+    ``interval`` seconds. Events for same path are delivered once
+    ``delay`` seconds after last event. """
+
+    if pyinotify:
+        fileMask = pyinotify.IN_MODIFY
+        dirMask = pyinotify.IN_CREATE|pyinotify.IN_DELETE|\
+            pyinotify.IN_MOVED_FROM|pyinotify.IN_MOVED_TO
+
+    # max inotify wait, thread checks stop flag
+    maxWait = 0.2
+
+    def __init__(self, interval=1.0, delay=0.03):
+        self.interval = interval
+        self.delay = delay
+
+        self._watches = []
+        self._pending = {}
+        self._lock = threading.RLock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._running = False
+        self._wm = None
+        self._notifier = None
+        self._nextpoll = 0
+        self._pid = os.getpid()
+
+    def watch(self, path, handler, recursive=False, poll=False):
+        """ Watch ``path``, ``handler`` is called with changed path and
+        directory flag in service thread. Returns :py:class:`Watch` """
+        watch = Watch(path, handler, recursive, poll)
+
+        with self._lock:
+            self.restart()
+            self._watches.append(watch)
+            if watch.poll:
+                watch.entries = _entries(path, recursive)
+            elif self._running:
+                self._addWatch(watch)
+            self.start()
+
+        self._wakeup.set()
+        return watch
+
+    def unwatch(self, watch):
+        with self._lock:
+            watch.active = False
+            if watch in self._watches:
+                self._watches.remove(watch)
+                if watch.wd is not None and self._wm is not None:
+                    self._wm.rm_watch(watch.wd, rec=watch.recursive,
+                                      quiet=True)
+                    watch.wd = None
+
+    def start(self):
+        with self._lock:
+            if self._running:
+                return
+
+            for watch in self._watches:
+                if not watch.poll and watch.wd is None:
+                    self._addWatch(watch)
+
+            self._running = True
+            self._thread = threading.Thread(target=self._run)
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self):
+        with self._lock:
+            self._running = False
+            thread, self._thread = self._thread, None
+
+        self._wakeup.set()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+        with self._lock:
+            self._closeNotifier()
+            self._pending.clear()
+
+    def clear(self):
+        """ Stop service and remove all watches """
+        self.stop()
+        with self._lock:
+            for watch in self._watches:
+                watch.active = False
+                watch.wd = None
+            self._watches = []
+
+    def restart(self):
+        """ Start service in forked process, thread and inotify instance
+        are not shared with parent process """
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+
+            self._pid = os.getpid()
+            self._running = False
+            self._thread = None
+            self._closeNotifier()
+            self._pending.clear()
+
+            if self._watches:
+                self.start()
+
+    def _addWatch(self, watch):
+        if self._wm is None:
+            self._wm = pyinotify.WatchManager()
+            self._notifier = pyinotify.Notifier(self._wm)
+
+        if os.path.isdir(watch.path):
+            mask = self.dirMask
+        else:
+            mask = self.fileMask
+
+        wds = self._wm.add_watch(
+            watch.path, mask,
+            lambda ev: self._event(watch, ev.pathname, ev.dir),
+            watch.recursive, watch.recursive, quiet=True)
+        watch.wd = wds.get(watch.path)
+
+    def _closeNotifier(self):
+        if self._notifier is not None and not self._running:
+            self._notifier.stop()
+            self._wm = self._notifier = None
+            for watch in self._watches:
+                watch.wd = None
+
+    def _event(self, watch, path, isdir):
+        # restart debounce window
+        self._pending[(watch, path)] = (time.time() + self.delay, isdir)
+
+    def _run(self):
+        while self._running:
+            now = time.time()
+            timeout = self.interval
+            if self._notifier is not None:
+                timeout = min(timeout, self.maxWait)
+            if self._pending:
+                timeout = min(
+                    timeout, min(t for t, d in self._pending.values()) - now)
+            if any(watch.poll for watch in self._watches):
+                timeout = min(timeout, self._nextpoll - now)
+            timeout = max(timeout, 0)
+
+            notifier = self._notifier
+            if notifier is not None:
+                if notifier.check_events(int(timeout * 1000)):
+                    notifier.read_events()
+                    notifier.process_events()
+            else:
+                self._wakeup.wait(timeout)
+                self._wakeup.clear()
+
+            if not self._running:
+                break
+
+            now = time.time()
+            if now >= self._nextpoll:
+                self._nextpoll = now + self.interval
+                self._poll()
+
+            self._fire(now)
+
+    def _poll(self):
+        for watch in list(self._watches):
+            if not watch.poll:
+                continue
+
+            entries = _entries(watch.path, watch.recursive)
+            old = watch.entries or {}
+            watch.entries = entries
+
+            if watch.path in entries and not entries[watch.path][0]:
+                # file watch
+                if old.get(watch.path) != entries[watch.path]:
+                    self._event(watch, watch.path, False)
+                continue
+
+            for path in sorted(set(entries) ^ set(old)):
+                if path != watch.path:
+                    self._event(watch, path, (entries.get(path) or
+                                              old.get(path))[0])
+
+    def _fire(self, now):
+        for key, (deadline, isdir) in sorted(
+                self._pending.items(), key=lambda item: item[1][0]):
+            if deadline <= now:
+                del self._pending[key]
+                watch, path = key
+                if watch.active:
+                    try:
+                        watch.handler(path, isdir)
+                    except Exception:
+                        log.exception("Error in watch handler: %s", path)
+
+
+def _entries(path, recursive):
+    """ Stat info of watched path and directory entries """
+    entries = {}
+    try:
+        st = os.stat(path)
+    except OSError:
+        return entries
+
+    isdir = stat.S_ISDIR(st.st_mode)
+    entries[path] = (isdir, st.st_mtime, st.st_size, st.st_ino)
+    if not isdir:
+        return entries
+
+    if recursive:
+        for root, dirs, files in os.walk(path):
+            for name in dirs:
+                entries[os.path.join(root, name)] = (True,)
+            for name in files:
+                entries[os.path.join(root, name)] = (False,)
+    else:
+        for name in os.listdir(path):
+            p = os.path.join(path, name)
+            entries[p] = (os.path.isdir(p),)
+
+    return entries
+
+
+watchService = WatchService()
+
+
+@shutdown.shutdownHandler
+def shutdownService():
+    watchService.stop()
+
+
+@api.addCleanup
+def cleanup():
+    watchService.clear()
@@ -0,0 +1,59 @@
+""" background settings writer """
+import logging, threading
+
+log = logging.getLogger('memphis.config')
+
+
+class BackgroundWriter(object):
+    """ Coalesces settings saves. Changes made within ``delay`` seconds
+    after first change are written with one storage save from background
+    thread. ``write`` is called with list of changed settings names. """
+
+    def __init__(self, write, delay=1.0):
+        self.write = write
+        self.delay = delay
+        self.changed = set()
+        self.pending = False
+        self._timer = None
+        self._lock = threading.Lock()
+        self._wlock = threading.Lock()
+
+    def schedule(self, changed=()):
+        with self._lock:
+            self.changed.update(changed)
+            self.pending = True
+
+            # timer thread doesn't exist in forked process
+            if self._timer is None or not self._timer.is_alive():
+                self._timer = threading.Timer(self.delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """ Write pending changes """
+        with self._wlock:
+            with self._lock:
+                self._cancel()
+                if not self.pending:
+                    return
+
+                changed, self.changed = self.changed, set()
+                self.pending = False
+
+            try:
+                self.write(sorted(changed))
+            except:
+                log.exception("Error saving settings")
+
+    def cancel(self):
+        """ Drop pending changes """
+        with self._lock:
+            self._cancel()
+            self.changed = set()
+            self.pending = False
+
+    def _cancel(self):
+        if self._timer is not None and \
+                self._timer is not threading.current_thread():
+            self._timer.cancel()
+        self._timer = None
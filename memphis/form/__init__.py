@@ -1,78 +1,82 @@
-# memphis.form public api
+# memphis.form public api, names are imported on first access
 
-from memphis.form.interfaces import null
-from memphis.form.interfaces import required
-from memphis.form.interfaces import Invalid
+from memphis.config.lazy import lazyModule
 
-# field
-from memphis.form.field import Field
-from memphis.form.field import FieldFactory
-from memphis.form.field import Fieldset
-from memphis.form.field import FieldsetErrors
+lazyModule(__name__, {
+    'null': 'memphis.form.interfaces',
+    'required': 'memphis.form.interfaces',
+    'Invalid': 'memphis.form.interfaces',
 
-# field registration
-from memphis.form.field import field
-from memphis.form.field import fieldPreview
-from memphis.form.field import getField
-from memphis.form.field import registerField
+    # field
+    'Field': 'memphis.form.field',
+    'FieldFactory': 'memphis.form.field',
+    'Fieldset': 'memphis.form.field',
+    'FieldsetErrors': 'memphis.form.field',
 
-# vocabulary
-from memphis.form.vocabulary import SimpleTerm
-from memphis.form.vocabulary import SimpleVocabulary
+    # field registration
+    'field': 'memphis.form.field',
+    'fieldPreview': 'memphis.form.field',
+    'getField': 'memphis.form.field',
+    'registerField': 'memphis.form.field',
 
-# widget mode
-from memphis.form.interfaces import FORM_INPUT
-from memphis.form.interfaces import FORM_DISPLAY
+    # vocabulary
+    'SimpleTerm': 'memphis.form.vocabulary',
+    'SimpleVocabulary': 'memphis.form.vocabulary',
 
-# validators
-from memphis.form.validator import All
-from memphis.form.validator import Function
-from memphis.form.validator import Regex
-from memphis.form.validator import Email
-from memphis.form.validator import Range
-from memphis.form.validator import Length
-from memphis.form.validator import OneOf
+    # widget mode
+    'FORM_INPUT': 'memphis.form.interfaces',
+    'FORM_DISPLAY': 'memphis.form.interfaces',
 
-# fields
-from memphis.form.fields import TextField
-from memphis.form.fields import IntegerField
-from memphis.form.fields import FloatField
-from memphis.form.fields import DecimalField
-from memphis.form.fields import TextAreaField
-from memphis.form.fields import FileField
-from memphis.form.fields import LinesField
-from memphis.form.fields import PasswordField
-from memphis.form.fields import DateField
-from memphis.form.fields import DateTimeField
-from memphis.form.fields import RadioField
-from memphis.form.fields import BoolField
-from memphis.form.fields import ChoiceField
-from memphis.form.fields import MultiChoiceField
-from memphis.form.fields import MultiSelectField
+    # validators
+    'All': 'memphis.form.validator',
+    'Function': 'memphis.form.validator',
+    'Regex': 'memphis.form.validator',
+    'Email': 'memphis.form.validator',
+    'Range': 'memphis.form.validator',
+    'Length': 'memphis.form.validator',
+    'OneOf': 'memphis.form.validator',
 
-# helper field classes
-from memphis.form.fields import VocabularyField
-from memphis.form.fields import BaseChoiceField
-from memphis.form.fields import BaseMultiChoiceField
+    # fields
+    'TextField': 'memphis.form.fields',
+    'IntegerField': 'memphis.form.fields',
+    'FloatField': 'memphis.form.fields',
+    'DecimalField': 'memphis.form.fields',
+    'TextAreaField': 'memphis.form.fields',
+    'FileField': 'memphis.form.fields',
+    'LinesField': 'memphis.form.fields',
+    'PasswordField': 'memphis.form.fields',
+    'DateField': 'memphis.form.fields',
+    'DateTimeField': 'memphis.form.fields',
+    'RadioField': 'memphis.form.fields',
+    'BoolField': 'memphis.form.fields',
+    'ChoiceField': 'memphis.form.fields',
+    'MultiChoiceField': 'memphis.form.fields',
+    'MultiSelectField': 'memphis.form.fields',
 
-# forms
-from memphis.form.form import Form
-from memphis.form.form import DisplayForm
-from memphis.form.form import FormWidgets
-from memphis.form.form import setCsrfUtility
+    # helper field classes
+    'VocabularyField': 'memphis.form.fields',
+    'BaseChoiceField': 'memphis.form.fields',
+    'BaseMultiChoiceField': 'memphis.form.fields',
 
-# form pagelets
-from memphis.form.form import FORM_VIEW
-from memphis.form.form import FORM_ACTIONS
-from memphis.form.form import FORM_WIDGET
-from memphis.form.form import FORM_DISPLAY_WIDGET
+    # forms
+    'Form': 'memphis.form.form',
+    'DisplayForm': 'memphis.form.form',
+    'FormWidgets': 'memphis.form.form',
+    'setCsrfUtility': 'memphis.form.form',
 
-# button
-from memphis.form.button import button
-from memphis.form.button import Button
-from memphis.form.button import Buttons
-from memphis.form.button import AC_DEFAULT
-from memphis.form.button import AC_PRIMARY
-from memphis.form.button import AC_DANGER
-from memphis.form.button import AC_SUCCESS
-from memphis.form.button import AC_INFO
+    # form pagelets
+    'FORM_VIEW': 'memphis.form.form',
+    'FORM_ACTIONS': 'memphis.form.form',
+    'FORM_WIDGET': 'memphis.form.form',
+    'FORM_DISPLAY_WIDGET': 'memphis.form.form',
+
+    # button
+    'button': 'memphis.form.button',
+    'Button': 'memphis.form.button',
+    'Buttons': 'memphis.form.button',
+    'AC_DEFAULT': 'memphis.form.button',
+    'AC_PRIMARY': 'memphis.form.button',
+    'AC_DANGER': 'memphis.form.button',
+    'AC_SUCCESS': 'memphis.form.button',
+    'AC_INFO': 'memphis.form.button',
+    })
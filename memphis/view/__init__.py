@@ -1,67 +1,73 @@
-# memphis.view public API
-
-# interfaces
-from memphis.view.interfaces import ILayout
-from memphis.view.interfaces import IRenderer
-
-# path/template
-from memphis.view.tmpl import path, template
-
-# base view
-from memphis.view.base import View
-
-# pagelet
-from memphis.view.pagelet import Pagelet
-from memphis.view.pagelet import renderPagelet
-from memphis.view.pagelet import registerPagelet
-from memphis.view.pagelet import pageletType
-
-# route
-from memphis.view.route import registerRoute
-
-# layout
-from memphis.view.layout import Layout
-from memphis.view.layout import queryLayout
-from memphis.view.layout import registerLayout
-
-# view
-from memphis.view.view import chained
-from memphis.view.view import subpath
-from memphis.view.view import renderView
-from memphis.view.view import registerView
-from memphis.view.view import registerDefaultView
-from memphis.view.view import setCheckPermission
-
-# renderers
-from memphis.view.renderers import Renderer
-from memphis.view.renderers import SimpleRenderer
-from memphis.view.renderers import json, JSONRenderer
-
-# layer
-from memphis.view.customize import layer
-from memphis.view.customize import LayerWrapper
-
-# resource
-from memphis.view.resources import static
-from memphis.view.resources import static_url
-
-# resource library
-from memphis.view.library import library
-from memphis.view.library import include
-from memphis.view.library import renderIncludes
-
-# directives
-from memphis.view.directives import layout
-from memphis.view.directives import pagelet
-from memphis.view.directives import pyramidView
-
-# status message
-from memphis.view.message import Message
-from memphis.view.message import addMessage
-from memphis.view.message import renderMessages
-
-# format
-from memphis.view.formatter import format
-
-# navigation root
-from memphis.view.interfaces import INavigationRoot
+# memphis.view public API, names are imported on first access
+
+from memphis.config.lazy import lazyModule
+
+lazyModule(__name__, {
+    # interfaces
+    'ILayout': 'memphis.view.interfaces',
+    'IRenderer': 'memphis.view.interfaces',
+
+    # path/template
+    'path': 'memphis.view.tmpl',
+    'template': 'memphis.view.tmpl',
+
+    # base view
+    'View': 'memphis.view.base',
+
+    # pagelet
+    'Pagelet': 'memphis.view.pagelet',
+    'renderPagelet': 'memphis.view.pagelet',
+    'registerPagelet': 'memphis.view.pagelet',
+    'pageletType': 'memphis.view.pagelet',
+
+    # route
+    'registerRoute': 'memphis.view.route',
+
+    # layout
+    'Layout': 'memphis.view.layout',
+    'queryLayout': 'memphis.view.layout',
+    'registerLayout': 'memphis.view.layout',
+
+    # view
+    'chained': 'memphis.view.view',
+    'subpath': 'memphis.view.view',
+    'renderView': 'memphis.view.view',
+    'registerView': 'memphis.view.view',
+    'registerDefaultView': 'memphis.view.view',
+    'setCheckPermission': 'memphis.view.view',
+
+    # renderers
+    'Renderer': 'memphis.view.renderers',
+    'SimpleRenderer': 'memphis.view.renderers',
+    'json': 'memphis.view.renderers',
+    'JSONRenderer': 'memphis.view.renderers',
+
+    # layer
+    'layer': 'memphis.view.customize',
+    'LayerWrapper': 'memphis.view.customize',
+
+    # resource
+    'static': 'memphis.view.resources',
+    'static_url': 'memphis.view.resources',
+
+    # resource library
+    'library': 'memphis.view.library',
+    'include': 'memphis.view.library',
+    'renderIncludes': 'memphis.view.library',
+
+    # directives
+    'layout': 'memphis.view.directives',
+    'pagelet': 'memphis.view.directives',
+    'pyramidView': 'memphis.view.directives',
+
+    # status message
+    'Message': 'memphis.view.message',
+    'addMessage': 'memphis.view.message',
+    'renderMessages': 'memphis.view.message',
+
+    # format
+    'format': 'memphis.view.formatter',
+
+    # navigation root
+    'INavigationRoot': 'memphis.view.interfaces',
+    })
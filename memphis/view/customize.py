@@ -28,7 +28,8 @@ TEMPLATE = config.registerSettings(
         name = 'watcher',
         default = 'inotify',
         title = 'Filesystem watcher',
-        description = 'Custom filesystem directory watcher.'),
+        description = 'Custom filesystem directory watcher: '
+                      'inotify or poll.'),
 
     config.SchemaNode(
         colander.Bool(),
@@ -165,50 +166,38 @@ class _GlobalLayerManager(object):
                 if t.custom is not None:
                     t.setCustom(None)
 
-try:
-    import pyinotify
-except ImportError: # pragma: no cover
-    pyinotify = None
-
 
 class iNotifyWatcher(object):
+    """ Custom directory watcher, directory is watched by process wide
+    watch service with inotify or with poller """
 
-    if pyinotify:
-        mask = pyinotify.IN_CREATE|pyinotify.IN_DELETE|\
-               pyinotify.IN_MOVED_FROM|pyinotify.IN_MOVED_TO
-
-    type = 'inotify'
-
-    def __init__(self, manager):
+    def __init__(self, manager, poll=False):
         self.manager = manager
         self.directory = manager.directory
+        self.poll = poll
+        self.type = poll and 'poll' or 'inotify'
 
         self._started = False
+        self._watch = None
 
-        if pyinotify:
-            self._wm = pyinotify.WatchManager()
-            self._notifier = pyinotify.ThreadedNotifier(self._wm)
-            self._wm.add_watch(
-                self.manager.directory,
-                self.mask, self._process_ev, True, True)
-
-    def _process_ev(self, ev):
-        if ev.dir:
+    def _process_ev(self, path, isdir):
+        if isdir:
             return
 
-        dir, pkg = os.path.split(ev.path)
+        dir, pkg = os.path.split(os.path.dirname(path))
         if self.directory == dir:
             self.manager.reloadPackage(pkg)
 
     def start(self):
-        if pyinotify:
-            self._notifier.start()
-            self._started = True
+        self._watch = config.watchService.watch(
+            self.directory, self._process_ev, True, self.poll)
+        self._started = True
 
     def stop(self):
         if self._started:
             self._started = False
-            self._notifier.stop()
+            config.watchService.unwatch(self._watch)
+            self._watch = None
 
 
 @config.subscriber(config.SettingsInitializing)
@@ -247,8 +236,9 @@ def initialize(*args):
 
         if config is not None and dir and \
                 TEMPLATE._watcher is None and TEMPLATE._manager is not None:
-            if TEMPLATE.watcher == 'inotify':
-                TEMPLATE._watcher = iNotifyWatcher(TEMPLATE._manager)
+            if TEMPLATE.watcher in ('inotify', 'poll'):
+                TEMPLATE._watcher = iNotifyWatcher(
+                    TEMPLATE._manager, TEMPLATE.watcher == 'poll')
                 TEMPLATE._watcher.start()
                 log.info('Starting custom directory filesystem watcher')
             else:
@@ -29,7 +29,13 @@ class FormatImpl(dict):
 format = FormatImpl()
 
 
-_tzs = dict((str(tz).lower(), str(tz)) for tz in pytz.all_timezones)
+_tzs = {}
+
+def _timezone(name):
+    # lower case names map is built on first case-insensitive lookup
+    if not _tzs:
+        _tzs.update((str(tz).lower(), str(tz)) for tz in pytz.all_timezones)
+    return pytz.timezone(_tzs[name.lower()])
 
 
 class Timezone(colander.SchemaType):
@@ -52,7 +58,7 @@ class Timezone(colander.SchemaType):
             try:
                 return pytz.timezone(v)
             except:
-                return pytz.timezone(_tzs[v.lower()])
+                return _timezone(v)
         except Exception, e:
             raise colander.Invalid(
                 node, _('"${val}" is not a timezone', mapping={'val':cstruct}))
@@ -125,15 +131,24 @@ FORMAT = config.registerSettings(
         description = _(u'Time full format')),
 
     title = 'Site formats',
+    compiled = True,
     )
 
+FORMAT.addAccessor(
+    'datetime_formats',
+    lambda values: dict(
+        (tp, u'%s %s'%(values['date_%s'%tp], values['time_%s'%tp]))
+        for tp in ('short', 'medium', 'long', 'full')))
+
 
 def datetimeFormatter(value, tp='medium', request=None):
     """ datetime format """
     if not isinstance(value, datetime):
         return value
 
-    tz = FORMAT.timezone
+    settings = FORMAT.pinned()
+
+    tz = settings.timezone
     if value.tzinfo is None:
         value = datetime(value.year, value.month, value.day, value.hour,
                          value.minute, value.second, value.microsecond,
@@ -141,8 +156,8 @@ def datetimeFormatter(value, tp='medium', request=None):
 
     value = value.astimezone(tz)
 
-    format = '%s %s'%(FORMAT['date_%s'%tp], FORMAT['time_%s'%tp])
-    return unicode(value.strftime(str(format)))
+    format = settings.datetime_formats[tp]
+    return value.strftime(format.encode('utf-8')).decode('utf-8')
 
 
 def timedeltaFormatter(value, type='short', request=None):
@@ -1,9 +1,11 @@
 """ layout implementation """
 import sys, logging
 from zope import interface
+from zope.interface import providedBy
 from pyramid.interfaces import IRequest, IRouteRequest
 
 from memphis import config
+from memphis.config.cache import LookupCache
 from memphis.view.base import View
 from memphis.view.formatter import format
 from memphis.view.interfaces import ILayout
@@ -12,16 +14,60 @@ from memphis.view.customize import LayerWrapper
 log = logging.getLogger('memphis.view')
 
 
+class LayoutCache(LookupCache):
+    """ Resolved layouts keyed by (specs of context and its parents,
+    request spec, layout name). Value is position of context in parents
+    chain and layout factory. """
+
+    def resolve(self, registry, contexts, request, name=u''):
+        self.check(registry)
+
+        key = (contexts, request, name)
+        try:
+            value = self.data[key]
+        except KeyError:
+            self.misses += 1
+            value = (None, None)
+            lookup = registry.adapters.lookup
+            for idx, spec in enumerate(contexts):
+                factory = lookup((spec, request), ILayout, name)
+                if factory is not None:
+                    value = (idx, factory)
+                    break
+            self._store(key, value)
+        else:
+            self.hits += 1
+
+        return value
+
+
+layoutCache = LayoutCache()
+
+
 def queryLayout(request, context, name=''):
     """ query named layout for context """
 
+    contexts = []
     while context is not None:
-        layout = config.registry.queryMultiAdapter(
-            (context, request), ILayout, name)
+        contexts.append(context)
+        context = getattr(context, '__parent__', None)
+
+    specs = tuple(map(providedBy, contexts))
+    reqspec = providedBy(request)
+
+    start = 0
+    while start < len(contexts):
+        idx, factory = layoutCache.resolve(
+            config.registry, specs[start:], reqspec, name)
+        if factory is None:
+            return None
+
+        layout = factory(contexts[start + idx], request)
         if layout is not None:
             return layout
 
-        context = getattr(context, '__parent__', None)
+        # factory returned None, continue with parents like queryMultiAdapter
+        start += idx + 1
 
     return None
 
@@ -141,3 +187,4 @@ _registered = []
 @config.addCleanup
 def cleanUp():
     _registered[:] = []
+    layoutCache.clear()
@@ -151,6 +151,27 @@ class TestGlobalCustomizeManagement(BaseLayerTest):
         time.sleep(0.1)
         self.assertEqual(tmpl(), '<div>Test template 1</div>')
 
+    def test_customize_global_poll_watcher(self):
+        self._mkfile1(self.file1)
+
+        tmpl = view.template(os.path.join(self.dir1, 'file.pt'))
+
+        interval = config.watchService.interval
+        config.watchService.interval = 0.05
+
+        # enable custom folder
+        self._init_memphis({'template.custom': self.dir2,
+                            'template.watcher': 'poll'})
+        self.assertEqual(customize.TEMPLATE._watcher.type, 'poll')
+        self.assertTrue(customize.TEMPLATE._watcher._watch.poll)
+        self.assertEqual(tmpl(), '<div>Test template 1</div>')
+
+        self._mkfile2(self.file2)
+        time.sleep(0.3)
+        self.assertEqual(tmpl(), '<div>Test template 2</div>')
+
+        config.watchService.interval = interval
+
     def test_customize_global_initialization_exc(self):
         orig = customize.iNotifyWatcher.start
         def start(self):
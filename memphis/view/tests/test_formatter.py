@@ -79,6 +79,12 @@ class TestFormatter(Base):
         self.assertEqual(format.datetime(dt, 'short'),
                          'Feb 06, 2011 04:35 AM')
 
+        # non ascii format
+        formatter.FORMAT['date_short'] = u'%d. M\xe4rz'
+
+        self.assertEqual(format.datetime(dt, 'short'),
+                         u'06. M\xe4rz 04:35 AM')
+
     def test_timedelta_formatter(self):
         format = formatter.format
         self.assertTrue('timedelta' in format)
@@ -161,6 +161,58 @@ class LayoutPagelet(Base):
 
         self.assertTrue('<html>View: test</html>' in res.body)
 
+    def test_layout_resolution_cache(self):
+        from memphis.view.layout import layoutCache
+
+        view.registerLayout('', context=Root)
+        self._init_memphis()
+
+        root = Root()
+        context = Context(Context(root))
+
+        layout = queryLayout(self.request, context, '')
+        self.assertTrue(layout.context is root)
+        self.assertEqual(layoutCache.stats()['misses'], 1)
+
+        # same specs, other objects
+        layout = queryLayout(self.request, Context(Context(Root())), '')
+        self.assertTrue(isinstance(layout, view.Layout))
+        self.assertEqual(layoutCache.stats()['hits'], 1)
+
+        self.assertTrue(queryLayout(self.request, context, 'test') is None)
+        self.assertTrue(queryLayout(self.request, context, 'test') is None)
+        self.assertEqual(layoutCache.stats()['misses'], 2)
+
+        # registry is changed
+        class Layout(view.Layout):
+            pass
+        config.registry.registerAdapter(
+            Layout, (Context, interface.Interface), view.ILayout, 'test')
+
+        layout = queryLayout(self.request, context, 'test')
+        self.assertTrue(isinstance(layout, Layout))
+        self.assertTrue(layout.context is context)
+        self.assertEqual(layoutCache.stats()['misses'], 3)
+
+    def test_layout_factory_returns_none(self):
+        view.registerLayout('', context=Root)
+        self._init_memphis()
+
+        root = Root()
+        context = Context(Context(root))
+
+        config.registry.registerAdapter(
+            lambda context, request: None,
+            (Context, interface.Interface), view.ILayout, '')
+
+        # lookup continues with parents
+        layout = queryLayout(self.request, context, '')
+        self.assertTrue(layout.context is root)
+        layout = queryLayout(self.request, context, '')
+        self.assertTrue(layout.context is root)
+
+        self.assertTrue(queryLayout(self.request, Context(), '') is None)
+
     def test_layout_simple_view_with_template(self):
         class View(view.View):
             def __call__(self):
@@ -53,3 +53,10 @@ class TestTmplCommand(unittest.TestCase):
 
         self.assertEqual(tapi.registry['memphis.view.tests']['test.pt'][1:3],
                          ['Test template', 'Test template description'])
+
+    def test_tmpl_preload(self):
+        tmpl = view.template('memphis.view.tests:templates/test.pt')
+        self.assertFalse(tmpl.default._cooked)
+
+        tapi.preloadTemplates(config.ApplicationPreloaded())
+        self.assertTrue(tmpl.default._cooked)
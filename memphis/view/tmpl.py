@@ -80,6 +80,15 @@ def path(spec, package_name=None):
     return abspath, package_name
 
 
+@config.subscriber(config.ApplicationPreloaded)
+def preloadTemplates(ev):
+    for data in registry.values():
+        for abspath, title, description, tmpl, pkg in data.values():
+            for t in (tmpl.default, tmpl.custom):
+                if t is not None:
+                    t.cook_check()
+
+
 @config.addCleanup
 def cleanup():
     registry.clear()